@@ -6,6 +6,8 @@
 import os
 import json
 import uuid
+import atexit
+import hashlib
 from flask import Flask, render_template, request, jsonify, make_response, send_from_directory
 from werkzeug.utils import secure_filename
 from datetime import timedelta
@@ -14,16 +16,29 @@ from datetime import timedelta
 from config import (
     BASE_DIR, UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_CONTENT_LENGTH,
     CLOTHING_TYPES, TEMPERATURE_RANGES, OUTFIT_STYLES, COLORS,
-    WEATHER_API_KEY_FILE, CITY_DATA_FILE
+    WEATHER_API_KEY_FILE, CITY_DATA_FILE, WEATHER_BATCH_MAX_CITIES,
+    CITY_SEARCH_DEFAULT_LIMIT, CITY_SEARCH_MAX_LIMIT, CITY_SEARCH_MAX_AGE, FORECAST_MAX_DAY,
+    THUMBNAIL_FOLDER, THUMBNAIL_MAX_AGE, CLOTHING_PAGE_SIZE, CLOTHING_PAGE_MAX
 )
 
 # 模型和服务导入
-from models.database import init_database, ClothingModel
+from models.database import (
+    init_database, ClothingModel, release_connection, close_connections, query_cache, duplicate_index
+)
 from services.recommender import OutfitRecommender
-from services.image_analyzer import analyze_clothing_image
+from services.analysis_cache import analyze_upload
+from services.upload_pipeline import upload_queue, submit_upload
+from services.task_queue import QueueFullError
+from services.thumbnails import delete_thumbnails
+from services.history import history_writer
 
 # 天气API
-from backend.weather.api import WeatherInformation, GetCityName
+from backend.weather.api import (
+    WeatherInformation, WeatherBatch, GetCityName, WeatherCacheStats,
+    ForecastInformation, ForecastForDay, weather_prefetcher, forecast_prefetcher
+)
+from backend.weather.cities import city_registry
+from backend.weather.search import city_search_index
 
 # 创建Flask应用
 app = Flask(
@@ -40,6 +55,30 @@ def allowed_file(filename):
     """检查文件扩展名是否允许"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def parse_day(value):
+    """解析预报天数：未提供时为 0，整数或整数字符串返回 int，其他值返回 None"""
+    if value is None or value == '':
+        return 0
+    if isinstance(value, str):
+        value = value.strip()
+        digits = value[1:] if value.startswith('-') else value
+        return int(value) if digits.isdecimal() else None
+    if isinstance(value, bool) or not isinstance(value, int):
+        return None
+    return value
+
+def busy_response():
+    """后台队列繁忙时的响应"""
+    resp = jsonify({'success': False, 'message': '服务器繁忙，请稍后重试'})
+    resp.status_code = 503
+    resp.headers['Retry-After'] = '5'
+    return resp
+
+@app.teardown_request
+def release_db_connection(exc):
+    """请求结束后把数据库连接放回连接池"""
+    release_connection()
+
 # ==================== 页面路由 ====================
 
 @app.route('/')
@@ -71,10 +110,42 @@ def get_config():
 
 @app.route('/api/clothing', methods=['GET'])
 def get_clothing():
-    """获取衣物列表"""
+    """
+    获取衣物列表
+    
+    参数:
+        type: 按类型筛选
+        fields: 逗号分隔的返回字段，例如 id,name,type,thumbnails
+        limit / cursor: 分页。传入任一参数时按 (created_at, id) 倒序返回一页，
+            响应中的 next_cursor 用于请求下一页；都不传时返回全部衣物
+    """
     clothing_type = request.args.get('type')
-    items = ClothingModel.get_all(clothing_type)
-    return jsonify({'success': True, 'data': items})
+    fields = request.args.get('fields')
+    # 元组：不分页时作为查询缓存键的一部分
+    fields = tuple(f.strip() for f in fields.split(',') if f.strip()) if fields else None
+    
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        # 字段在查询前校验，只读取请求的列
+        try:
+            items = ClothingModel.get_all(clothing_type, fields)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        return jsonify({'success': True, 'data': items})
+    
+    limit = request.args.get('limit', CLOTHING_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, CLOTHING_PAGE_MAX))
+    try:
+        items, next_cursor = ClothingModel.get_page(
+            clothing_type, limit, request.args.get('cursor') or None, fields
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'data': items,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    })
 
 @app.route('/api/clothing', methods=['POST'])
 def add_clothing():
@@ -91,6 +162,10 @@ def add_clothing():
         if not allowed_file(file.filename):
             return jsonify({'success': False, 'message': f'不支持的图片格式，仅支持: {ALLOWED_EXTENSIONS}'}), 400
         
+        # 后台队列已满时直接拒绝，避免积压
+        if upload_queue.is_full():
+            return busy_response()
+        
         # 获取表单数据
         name = request.form.get('name', '').strip()
         clothing_type = request.form.get('type', '').strip()
@@ -130,15 +205,62 @@ def add_clothing():
             description=description
         )
         
+        # 分析等耗时处理交给后台队列；入队失败不影响已保存的衣物
+        try:
+            job_id = submit_upload(clothing_id, relative_path, fill_color=not color)
+        except QueueFullError:
+            job_id = None
+        
         return jsonify({
             'success': True, 
             'message': '添加成功',
-            'data': {'id': clothing_id, 'image_path': relative_path}
+            'data': {'id': clothing_id, 'image_path': relative_path, 'job_id': job_id}
         })
         
     except Exception as e:
         return jsonify({'success': False, 'message': f'添加失败: {str(e)}'}), 500
 
+@app.route('/api/analyze', methods=['POST'])
+def analyze_image():
+    """分析衣物图片，返回建议的类型、颜色和温度范围"""
+    try:
+        if 'image' not in request.files:
+            return jsonify({'success': False, 'message': '请上传图片'}), 400
+        
+        file = request.files['image']
+        if file.filename == '':
+            return jsonify({'success': False, 'message': '请选择图片'}), 400
+        
+        if not allowed_file(file.filename):
+            return jsonify({'success': False, 'message': f'不支持的图片格式，仅支持: {ALLOWED_EXTENSIONS}'}), 400
+        
+        content_hash, result, cached = analyze_upload(file.stream)
+        
+        # 提示衣橱中疑似重复的衣物
+        duplicates = []
+        if result.get('phash'):
+            matches = duplicate_index.find(result['phash'])
+            items = ClothingModel.get_by_ids([match['id'] for match in matches])
+            for match in matches:
+                item = items.get(match['id'])
+                if item:
+                    duplicates.append({'id': item['id'], 'name': item['name'], 'type': item['type'],
+                                       'image_path': item['image_path'], 'distance': match['distance']})
+        
+        return jsonify({'success': True, 'data': result, 'hash': content_hash, 'cached': cached,
+                        'duplicates': duplicates})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'分析失败: {str(e)}'}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询后台任务状态"""
+    job = upload_queue.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': '任务不存在'}), 404
+    return jsonify({'success': True, 'data': job})
+
 @app.route('/api/clothing/<int:clothing_id>', methods=['DELETE'])
 def delete_clothing(clothing_id):
     """删除衣物"""
@@ -152,6 +274,7 @@ def delete_clothing(clothing_id):
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], '..', item['image_path'])
             if os.path.exists(file_path):
                 os.remove(file_path)
+        delete_thumbnails(item.get('thumbnails'))
         
         # 删除数据库记录
         ClothingModel.delete(clothing_id)
@@ -170,14 +293,27 @@ def get_recommendation():
             temperature = data.get('temperature')
             city = data.get('city')
             style = data.get('style')
+            day = data.get('day')
         else:
             temperature = request.args.get('temperature')
             city = request.args.get('city')
             style = request.args.get('style')
+            day = request.args.get('day')
         
-        # 如果提供了城市，获取实时天气
+        day = parse_day(day)
+        if day is None or not 0 <= day <= FORECAST_MAX_DAY:
+            return jsonify({'success': False, 'message': f'day 必须是 0 ~ {FORECAST_MAX_DAY} 的整数'}), 400
+        
+        # 如果提供了城市，今天使用实时天气，之后几天使用预报
         weather_data = None
-        if city:
+        forecast_data = None
+        if city and day > 0:
+            forecast_data = ForecastForDay(city, day)
+            if forecast_data:
+                temperature = OutfitRecommender.get_forecast_temperature(
+                    forecast_data.get('daytemp', 25), forecast_data.get('nighttemp', 25)
+                )
+        elif city:
             weather_response = WeatherInformation(city)
             if weather_response.get('status') == '1' and weather_response.get('lives'):
                 weather_data = weather_response['lives'][0]
@@ -191,11 +327,25 @@ def get_recommendation():
         # 获取推荐
         recommendations = OutfitRecommender.recommend(temperature, style, count=3)
         
+        # 记录推荐历史（只写入内存缓冲区，由后台线程批量写库）
+        if weather_data:
+            weather = weather_data.get('weather')
+        elif forecast_data:
+            weather = forecast_data.get('dayweather')
+        else:
+            weather = None
+        history_writer.record(
+            temperature, weather, city,
+            [[item['id'] for item in outfit['items'].values()] for outfit in recommendations]
+        )
+        
         # 构建响应
         response = {
             'success': True,
             'temperature': temperature,
             'weather': weather_data,
+            'forecast': forecast_data,
+            'day': day,
             'recommendations': recommendations,
             'tips': OutfitRecommender.OUTFIT_RULES.get(
                 OutfitRecommender.get_temperature_level(temperature), {}
@@ -216,6 +366,16 @@ def get_wardrobe_summary():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/history/stats', methods=['GET'])
+def get_history_stats():
+    """获取推荐历史写入统计（含缓冲区满时丢弃的条数）"""
+    return jsonify({'success': True, 'data': history_writer.stats()})
+
+@app.route('/api/clothing/cache/stats', methods=['GET'])
+def get_clothing_cache_stats():
+    """获取衣物查询缓存统计"""
+    return jsonify({'success': True, 'data': query_cache.stats()})
+
 @app.route('/api/weather/view', methods=['GET'])
 def get_weather():
     """获取天气信息"""
@@ -226,12 +386,61 @@ def get_weather():
     resp.headers['Content-Type'] = 'application/json; charset=UTF-8'
     return resp
 
+@app.route('/api/weather/forecast', methods=['GET'])
+def get_forecast():
+    """获取天气预报"""
+    city_name = request.args.get('city', '上海市')
+    forecast_data = ForecastInformation(city_name)
+    resp = make_response(json.dumps(forecast_data, ensure_ascii=False))
+    resp.headers['Content-Type'] = 'application/json; charset=UTF-8'
+    return resp
+
+@app.route('/api/weather/batch', methods=['GET', 'POST'])
+def get_weather_batch():
+    """批量获取多个城市的天气信息"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        cities = data.get('cities') if isinstance(data, dict) else None
+        if cities is None:
+            cities = []
+        if not isinstance(cities, list) or not all(isinstance(c, str) for c in cities):
+            return jsonify({'success': False, 'message': 'cities 必须是城市名称的字符串列表'}), 400
+    else:
+        cities = request.args.get('cities', '').split(',')
+    cities = [c.strip() for c in cities if c.strip()]
+    
+    if not cities:
+        return jsonify({'success': False, 'message': '请提供城市列表'}), 400
+    if len(cities) > WEATHER_BATCH_MAX_CITIES:
+        return jsonify({'success': False, 'message': f'一次最多查询 {WEATHER_BATCH_MAX_CITIES} 个城市'}), 400
+    
+    return jsonify({'success': True, 'data': WeatherBatch(cities)})
+
+@app.route('/api/weather/stats', methods=['GET'])
+def get_weather_stats():
+    """获取天气缓存统计"""
+    return jsonify({'success': True, 'data': WeatherCacheStats()})
+
 @app.route('/api/weather/cities', methods=['GET'])
 def get_cities():
     """获取城市列表"""
     city_list = GetCityName()
     return jsonify(city_list)
 
+@app.route('/api/weather/cities/search', methods=['GET'])
+def search_cities():
+    """搜索城市（前缀 / 拼音 / 首字母）"""
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', CITY_SEARCH_DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, CITY_SEARCH_MAX_LIMIT))
+    
+    results = city_search_index.search(query, limit)
+    resp = jsonify({'success': True, 'data': results})
+    etag_key = f"{city_search_index.version}|{limit}|{query.strip().lower()}"
+    resp.set_etag(hashlib.sha1(etag_key.encode('utf-8')).hexdigest())
+    resp.headers['Cache-Control'] = f'public, max-age={CITY_SEARCH_MAX_AGE}'
+    return resp.make_conditional(request)
+
 # ==================== 静态文件服务 ====================
 
 @app.route('/static/uploads/<path:filename>')
@@ -239,19 +448,45 @@ def uploaded_file(filename):
     """提供上传的文件"""
     return send_from_directory(UPLOAD_FOLDER, filename)
 
+@app.route('/static/thumbs/<path:filename>')
+def thumbnail_file(filename):
+    """提供缩略图，文件名带内容指纹，可长期缓存"""
+    resp = send_from_directory(THUMBNAIL_FOLDER, filename, max_age=THUMBNAIL_MAX_AGE)
+    resp.headers['Cache-Control'] = f'public, max-age={THUMBNAIL_MAX_AGE}, immutable'
+    return resp
+
 # ==================== 初始化 ====================
 
 def initialize():
     """应用初始化"""
-    # 确保上传目录存在
+    # 确保上传和缩略图目录存在
     for clothing_type in CLOTHING_TYPES.keys():
-        type_folder = os.path.join(UPLOAD_FOLDER, clothing_type)
-        os.makedirs(type_folder, exist_ok=True)
+        os.makedirs(os.path.join(UPLOAD_FOLDER, clothing_type), exist_ok=True)
+        os.makedirs(os.path.join(THUMBNAIL_FOLDER, clothing_type), exist_ok=True)
     
     # 初始化数据库
     init_database()
+    
+    # 预加载城市表和搜索索引
+    city_registry.load()
+    city_search_index.build()
+    
+    # 启动后台任务，进程退出时停止
+    weather_prefetcher.start()
+    forecast_prefetcher.start()
+    upload_queue.start()
+    history_writer.start()
+    atexit.register(shutdown)
     print("✅ 应用初始化完成")
 
+def shutdown():
+    """停止后台任务并关闭数据库连接"""
+    weather_prefetcher.stop()
+    forecast_prefetcher.stop()
+    upload_queue.stop()
+    history_writer.stop()
+    close_connections()
+
 if __name__ == '__main__':
     initialize()
     app.run(host='0.0.0.0', port=5000, debug=True)
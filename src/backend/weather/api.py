@@ -1,29 +1,131 @@
-from openpyxl import load_workbook
-import requests
 import json 
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
-CITY_FILE_NAME="backend/weather/AMap_adcode_citycode.xlsx"
-SHEET_NAME="Sheet1"
+from config import (
+    WEATHER_API_KEY_FILE, WEATHER_CACHE_TTL, WEATHER_CACHE_STALE_TTL, WEATHER_BATCH_WORKERS,
+    WEATHER_FORECAST_TTL, WEATHER_FORECAST_STALE_TTL
+)
+from backend.weather.cities import city_registry
+from backend.weather.cache import WeatherCache
+from backend.weather.client import WeatherClient, WeatherError
+from backend.weather.prefetch import WeatherPrefetcher
+
+WEATHER_INFO_PATH = "/v3/weather/weatherInfo"
+
+def _IsSuccess(data) -> bool:
+    return isinstance(data, dict) and data.get('status') == '1'
+
+# 实况天气缓存，只缓存成功的响应
+weather_cache = WeatherCache(
+    ttl=WEATHER_CACHE_TTL,
+    stale_ttl=WEATHER_CACHE_STALE_TTL,
+    cacheable=_IsSuccess
+)
+
+# 预报天气缓存
+forecast_cache = WeatherCache(
+    ttl=WEATHER_FORECAST_TTL,
+    stale_ttl=WEATHER_FORECAST_STALE_TTL,
+    cacheable=_IsSuccess
+)
+
+weather_client = WeatherClient()
+
+# 热门城市预取，由 app.initialize() 启动；预报也一并预取，次日推荐无需请求上游
+weather_prefetcher = WeatherPrefetcher(weather_cache, lambda adcode: FetchWeather(adcode))
+forecast_prefetcher = WeatherPrefetcher(forecast_cache, lambda adcode: FetchForecast(adcode))
+
+# 批量查询使用的有界线程池
+batch_executor = ThreadPoolExecutor(max_workers=WEATHER_BATCH_WORKERS, thread_name_prefix='weather-batch')
 
 def GetCityAdcode(city) -> int:
-    wb = load_workbook(CITY_FILE_NAME)
-    ws = wb[SHEET_NAME] 
-    for row in ws.iter_rows(values_only=True):
-        if row[0] == str(city):
-            return row[1]
+    return city_registry.get_adcode(city)
 
 def GetCityName() -> list:
-    wb = load_workbook(CITY_FILE_NAME)
-    ws = wb[SHEET_NAME] 
-    city_list = []
-    for row in ws.iter_rows(values_only=True):
-        city_list.append(row[0])
-    return city_list
+    return city_registry.names()
 
+@functools.lru_cache(maxsize=1)
 def GetWeatherApiKey() -> str:
-    return open("backend/weather/.api_key").read()
+    with open(WEATHER_API_KEY_FILE) as f:
+        return f.read().strip()
+
+def FetchWeather(adcode) -> any:
+    return weather_client.get_json(WEATHER_INFO_PATH, {'city': adcode, 'key': GetWeatherApiKey()})
+
+def FetchForecast(adcode) -> any:
+    return weather_client.get_json(WEATHER_INFO_PATH, {'city': adcode, 'key': GetWeatherApiKey(), 'extensions': 'all'})
+
+def _Unavailable(error) -> dict:
+    # 与高德失败响应保持同样的结构，调用方按 status 判断即可
+    return {'status': '0', 'info': str(error), 'infocode': 'UNAVAILABLE'}
 
 def WeatherInformation(city) -> any:
-    url = "https://restapi.amap.com/v3/weather/weatherInfo?city={city}&key={key}".format(city=GetCityAdcode(city), key=GetWeatherApiKey())
-    ret = requests.get(url)
-    return ret.json()
+    adcode = GetCityAdcode(city)
+    if adcode is not None:
+        weather_prefetcher.record(str(adcode))
+        forecast_prefetcher.record(str(adcode))
+    return WeatherInformationByAdcode(adcode)
+
+def WeatherInformationByAdcode(adcode) -> any:
+    try:
+        return weather_cache.get(str(adcode), lambda: FetchWeather(adcode))
+    except WeatherError as e:
+        return _Unavailable(e)
+
+def ForecastInformation(city) -> any:
+    adcode = GetCityAdcode(city)
+    if adcode is not None:
+        forecast_prefetcher.record(str(adcode))
+    try:
+        return forecast_cache.get(str(adcode), lambda: FetchForecast(adcode))
+    except WeatherError as e:
+        return _Unavailable(e)
+
+def ForecastForDay(city, day) -> dict:
+    """返回第 day 天（0 为今天）的预报，没有数据时返回 None"""
+    data = ForecastInformation(city)
+    if data.get('status') != '1' or not data.get('forecasts'):
+        return None
+    casts = data['forecasts'][0].get('casts') or []
+    return casts[day] if 0 <= day < len(casts) else None
+
+def _BatchItem(city, adcode, data) -> dict:
+    if data.get('status') == '1' and data.get('lives'):
+        return {'city': city, 'adcode': adcode, 'status': 'ok', 'weather': data['lives'][0]}
+    return {'city': city, 'adcode': adcode, 'status': 'error', 'weather': None,
+            'message': data.get('info', '获取天气失败')}
+
+def WeatherBatch(cities) -> list:
+    """批量查询多个城市的实况天气，未命中缓存的城市并发请求上游"""
+    adcodes = {city: GetCityAdcode(city) for city in cities}
+
+    # 同一 adcode 只请求一次；新鲜缓存直接读取，其余并发拉取
+    results = {}
+    pending = {}
+    for adcode in set(a for a in adcodes.values() if a is not None):
+        key = str(adcode)
+        value, age = weather_cache.peek(key)
+        if value is not None and age < weather_cache.ttl:
+            results[key] = WeatherInformationByAdcode(adcode)
+        else:
+            pending[key] = batch_executor.submit(WeatherInformationByAdcode, adcode)
+    for key, future in pending.items():
+        results[key] = future.result()
+
+    items = []
+    for city, adcode in adcodes.items():
+        if adcode is None:
+            items.append({'city': city, 'adcode': None, 'status': 'not_found', 'weather': None,
+                          'message': '未找到该城市'})
+        else:
+            items.append(_BatchItem(city, adcode, results[str(adcode)]))
+    return items
+
+def WeatherCacheStats() -> dict:
+    stats = weather_cache.stats()
+    stats['breaker'] = weather_client.breaker.state
+    stats['prefetch'] = weather_prefetcher.stats()
+    stats['forecast'] = forecast_cache.stats()
+    stats['forecast']['prefetch'] = forecast_prefetcher.stats()
+    return stats
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+天气数据缓存
+
+- 按 key（adcode）缓存，TTL 可配置
+- 同一 key 的并发未命中只触发一次上游请求（single-flight）
+- 过期但仍在 stale 窗口内的数据直接返回，同时在后台刷新（stale-while-revalidate）
+"""
+import time
+import threading
+
+
+class _Entry:
+    __slots__ = ('value', 'fetched_at')
+
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class _Flight:
+    """一次进行中的上游请求"""
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class WeatherCache:
+    """带 single-flight 和 stale-while-revalidate 的 TTL 缓存"""
+
+    def __init__(self, ttl, stale_ttl=0, cacheable=None, clock=time.monotonic):
+        """
+        Args:
+            ttl: 新鲜期（秒）
+            stale_ttl: 过期后仍可返回旧数据的时长（秒）
+            cacheable: 判断结果是否可缓存的函数，默认全部缓存
+            clock: 时钟函数，便于替换
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cacheable = cacheable or (lambda value: True)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'coalesced': 0, 'refresh_errors': 0}
+
+    def get(self, key, loader):
+        """读取缓存，未命中时调用 loader() 加载"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry.fetched_at if entry else None
+
+            if entry and age < self.ttl:
+                self._stats['hits'] += 1
+                return entry.value
+
+            if entry and age < self.ttl + self.stale_ttl:
+                self._stats['stale'] += 1
+                if key not in self._inflight:
+                    flight = self._inflight[key] = _Flight()
+                    threading.Thread(
+                        target=self._refresh, args=(key, loader, flight), daemon=True
+                    ).start()
+                return entry.value
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                self._stats['misses'] += 1
+                flight = self._inflight[key] = _Flight()
+            else:
+                self._stats['coalesced'] += 1
+
+        if leader:
+            self._load(key, loader, flight)
+        else:
+            flight.event.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def refresh(self, key, loader):
+        """
+        同步刷新指定 key（已有进行中的请求时直接返回）
+
+        Returns:
+            bool: 是否写入了新数据
+        """
+        with self._lock:
+            if key in self._inflight:
+                return False
+            flight = self._inflight[key] = _Flight()
+        self._load(key, loader, flight)
+        return flight.error is None and self.cacheable(flight.value)
+
+    def peek(self, key):
+        """返回 (value, age)，不触发加载；不存在时返回 (None, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            return entry.value, self.clock() - entry.fetched_at
+
+    def put(self, key, value):
+        """直接写入缓存"""
+        with self._lock:
+            self._entries[key] = _Entry(value, self.clock())
+
+    def invalidate(self, key=None):
+        """删除指定 key，key 为空时清空"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """命中统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['stale'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _load(self, key, loader, flight):
+        try:
+            flight.value = loader()
+            if self.cacheable(flight.value):
+                self.put(key, flight.value)
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _refresh(self, key, loader, flight):
+        self._load(key, loader, flight)
+        if flight.error is not None:
+            with self._lock:
+                self._stats['refresh_errors'] += 1
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+城市 / adcode 注册表
+
+AMap_adcode_citycode.xlsx 只在首次使用时解析一次，之后所有查询都走内存字典。
+解析结果会写入一个紧凑的 JSON 缓存（以 xlsx 的 mtime 作为失效依据），
+冷启动的进程直接读缓存即可，请求路径上不再需要 openpyxl。
+"""
+import os
+import json
+import threading
+
+from config import CITY_DATA_FILE, CITY_CACHE_FILE
+
+SHEET_NAME = "Sheet1"
+CACHE_VERSION = 1
+
+
+class CityRegistry:
+    """城市名 <-> adcode 双向索引"""
+
+    def __init__(self, source=CITY_DATA_FILE, cache_file=CITY_CACHE_FILE):
+        self.source = source
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._rows = None
+        self._name_to_adcode = {}
+        self._adcode_to_name = {}
+        self.version = ''
+
+    def load(self):
+        """加载城市表（幂等，线程安全）"""
+        if self._rows is not None:
+            return self
+        with self._lock:
+            if self._rows is None:
+                mtime = os.path.getmtime(self.source)
+                rows = self._read_cache(mtime)
+                if rows is None:
+                    rows = self._parse_workbook()
+                    self._write_cache(mtime, rows)
+                self.version = f"{mtime:.0f}"
+                self._build_index(rows)
+        return self
+
+    def get_adcode(self, city):
+        """城市名 -> adcode，同名城市取表中第一条"""
+        self.load()
+        return self._name_to_adcode.get(str(city))
+
+    def get_name(self, adcode):
+        """adcode -> 城市名"""
+        self.load()
+        return self._adcode_to_name.get(str(adcode))
+
+    def names(self):
+        """按表格顺序返回全部城市名"""
+        self.load()
+        return [row[0] for row in self._rows]
+
+    def rows(self):
+        """按表格顺序返回 (中文名, adcode, citycode) 行"""
+        self.load()
+        return self._rows
+
+    def _build_index(self, rows):
+        name_to_adcode = {}
+        adcode_to_name = {}
+        for name, adcode, _citycode in rows:
+            name_to_adcode.setdefault(str(name), adcode)
+            adcode_to_name.setdefault(str(adcode), name)
+        self._name_to_adcode = name_to_adcode
+        self._adcode_to_name = adcode_to_name
+        self._rows = rows
+
+    def _parse_workbook(self):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(self.source, read_only=True)
+        try:
+            ws = wb[SHEET_NAME]
+            return [tuple(row[:3]) for row in ws.iter_rows(values_only=True)]
+        finally:
+            wb.close()
+
+    def _read_cache(self, mtime):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != CACHE_VERSION or data.get('mtime') != mtime:
+            return None
+        return [tuple(row) for row in data['rows']]
+
+    def _write_cache(self, mtime, rows):
+        tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'mtime': mtime, 'rows': rows},
+                          f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            # 缓存只是加速手段，写失败不影响查询
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# 全局注册表
+city_registry = CityRegistry()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+高德天气 HTTP 客户端
+
+- requests.Session + 连接池，复用 keep-alive 连接
+- 连接 / 读取超时
+- 有限次数的重试（指数退避 + 随机抖动）
+- 熔断器：连续失败后快速失败，冷却后放行一次试探请求
+"""
+import time
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    WEATHER_API_BASE_URL, WEATHER_CONNECT_TIMEOUT, WEATHER_READ_TIMEOUT,
+    WEATHER_MAX_RETRIES, WEATHER_RETRY_BACKOFF, WEATHER_POOL_SIZE,
+    WEATHER_BREAKER_THRESHOLD, WEATHER_BREAKER_RESET
+)
+
+
+class WeatherError(Exception):
+    """天气服务不可用"""
+
+
+class CircuitOpenError(WeatherError):
+    """熔断器打开，请求被直接拒绝"""
+
+
+class CircuitBreaker:
+    """简单的三态熔断器：closed -> open -> half_open -> closed"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold=WEATHER_BREAKER_THRESHOLD, reset_timeout=WEATHER_BREAKER_RESET,
+                 clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def allow(self):
+        """是否放行本次请求"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.threshold:
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+            self._trial_running = False
+
+    def _current_state(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+
+class WeatherClient:
+    """带连接池、超时、重试和熔断的高德 API 客户端"""
+
+    RETRY_STATUS = {500, 502, 503, 504}
+
+    def __init__(self, base_url=WEATHER_API_BASE_URL, connect_timeout=WEATHER_CONNECT_TIMEOUT,
+                 read_timeout=WEATHER_READ_TIMEOUT, max_retries=WEATHER_MAX_RETRIES,
+                 backoff=WEATHER_RETRY_BACKOFF, pool_size=WEATHER_POOL_SIZE, breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_json(self, path, params):
+        """
+        GET 请求并解析 JSON
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+            WeatherError: 重试后仍然失败
+        """
+        url = self.base_url + path
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # 指数退避 + 全抖动
+                time.sleep(random.uniform(0, self.backoff * (2 ** (attempt - 1))))
+
+            if not self.breaker.allow():
+                raise CircuitOpenError('天气服务暂不可用（熔断中）')
+
+            try:
+                resp = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                self.breaker.record_failure()
+                last_error = e
+                continue
+
+            if resp.status_code in self.RETRY_STATUS:
+                self.breaker.record_failure()
+                last_error = f'HTTP {resp.status_code}'
+                continue
+
+            # 4xx 说明服务本身可用，不重试也不计入熔断
+            self.breaker.record_success()
+            if resp.status_code >= 400:
+                raise WeatherError(f'天气服务拒绝请求: HTTP {resp.status_code}')
+            try:
+                return resp.json()
+            except ValueError as e:
+                raise WeatherError('天气服务返回了无效的 JSON') from e
+
+        raise WeatherError(f'天气服务请求失败: {last_error}')
+
+    def close(self):
+        self.session.close()
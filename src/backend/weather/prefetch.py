@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热门城市天气预取
+
+记录各城市的请求热度（指数衰减计数），后台线程定期挑出最热门的城市，
+在缓存过期前主动刷新，使推荐接口中的天气查询几乎总是命中内存。
+上游请求数受令牌桶预算限制。
+"""
+import time
+import threading
+
+from config import (
+    WEATHER_PREFETCH_INTERVAL, WEATHER_PREFETCH_TOP_N, WEATHER_PREFETCH_LEAD,
+    WEATHER_PREFETCH_BUDGET, WEATHER_PREFETCH_DECAY
+)
+
+
+class WeatherPrefetcher:
+    """热门城市天气预取调度器"""
+
+    def __init__(self, cache, loader, interval=WEATHER_PREFETCH_INTERVAL,
+                 top_n=WEATHER_PREFETCH_TOP_N, lead=WEATHER_PREFETCH_LEAD,
+                 budget=WEATHER_PREFETCH_BUDGET, decay=WEATHER_PREFETCH_DECAY,
+                 clock=time.monotonic):
+        """
+        Args:
+            cache: WeatherCache 实例
+            loader: loader(key) -> 最新数据
+            interval: 调度间隔（秒）
+            top_n: 每轮最多考虑的热门城市数
+            lead: 距离过期多少秒内开始刷新
+            budget: 每小时最多发起的预取请求数
+            decay: 每轮热度衰减系数
+        """
+        self.cache = cache
+        self.loader = loader
+        self.interval = interval
+        self.top_n = top_n
+        self.lead = lead
+        self.budget = budget
+        self.decay = decay
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._heat = {}
+        self._tokens = float(budget)
+        self._last_refill = clock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stats = {'runs': 0, 'refreshed': 0, 'errors': 0, 'skipped_budget': 0}
+
+    def record(self, key):
+        """记录一次请求"""
+        with self._lock:
+            self._heat[key] = self._heat.get(key, 0.0) + 1.0
+
+    def hot_keys(self):
+        """按热度从高到低返回前 top_n 个 key"""
+        with self._lock:
+            ranked = sorted(self._heat.items(), key=lambda kv: kv[1], reverse=True)
+        return [key for key, _ in ranked[:self.top_n]]
+
+    def start(self):
+        """启动后台线程（重复调用无副作用）"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='weather-prefetch', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """停止后台线程并等待退出"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self):
+        """执行一轮预取"""
+        self._refill()
+        for key in self.hot_keys():
+            if self._stop_event.is_set():
+                break
+            _value, age = self.cache.peek(key)
+            if age is not None and age < self.cache.ttl - self.lead:
+                continue
+            if not self._take_token():
+                with self._lock:
+                    self._stats['skipped_budget'] += 1
+                break
+            ok = self.cache.refresh(key, lambda: self.loader(key))
+            with self._lock:
+                self._stats['refreshed' if ok else 'errors'] += 1
+        self._decay()
+        with self._lock:
+            self._stats['runs'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tracked'] = len(self._heat)
+            stats['tokens'] = round(self._tokens, 2)
+        stats['running'] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"天气预取失败: {e}")
+
+    def _refill(self):
+        now = self.clock()
+        with self._lock:
+            elapsed = now - self._last_refill
+            self._last_refill = now
+            self._tokens = min(float(self.budget), self._tokens + elapsed * self.budget / 3600)
+
+    def _take_token(self):
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _decay(self):
+        with self._lock:
+            self._heat = {k: v * self.decay for k, v in self._heat.items() if v * self.decay >= 0.05}
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+城市搜索索引
+
+基于有序数组 + 二分查找的前缀索引，支持：
+- 中文名前缀匹配
+- 全拼 / 首字母前缀匹配（需要安装可选依赖 pypinyin）
+- 前缀结果不足时回退到中文名子串匹配
+"""
+import bisect
+import threading
+
+from backend.weather.cities import city_registry
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # 拼音匹配为可选功能
+    lazy_pinyin = None
+
+
+class _PrefixArray:
+    """有序 (key, 值) 数组，O(log n + k) 前缀查询"""
+
+    def __init__(self, pairs):
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.values = [value for _, value in pairs]
+
+    def prefix(self, query):
+        i = bisect.bisect_left(self.keys, query)
+        while i < len(self.keys) and self.keys[i].startswith(query):
+            yield self.values[i]
+            i += 1
+
+
+class CitySearchIndex:
+    """城市名搜索索引，首次使用时构建"""
+
+    def __init__(self, registry=city_registry):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._built = False
+        self._cities = []
+        self._indexes = []
+        self.version = ''
+
+    @property
+    def pinyin_enabled(self):
+        return lazy_pinyin is not None
+
+    def build(self):
+        """构建索引（幂等，线程安全）"""
+        if self._built:
+            return self
+        with self._lock:
+            if not self._built:
+                self._build()
+                self._built = True
+        return self
+
+    def search(self, query, limit=10):
+        """
+        搜索城市
+
+        Returns:
+            list: [{'name': 城市名, 'adcode': adcode}, ...]
+        """
+        self.build()
+        query = (query or '').strip().lower()
+        if not query or limit <= 0:
+            return []
+
+        # 依次匹配：中文名 > 全拼 > 首字母 > 中文名子串
+        # 同一层内省、地级市（adcode 以 00 结尾）优先，其次名字越短越靠前
+        sources = [index.prefix(query) for index in self._indexes]
+        sources.append(i for i, city in enumerate(self._cities) if query in city['name'])
+
+        seen = set()
+        results = []
+        for source in sources:
+            matches = sorted(set(source) - seen, key=self._rank)
+            seen.update(matches)
+            results.extend(matches)
+            if len(results) >= limit:
+                break
+        return [self._cities[i] for i in results[:limit]]
+
+    def _rank(self, i):
+        city = self._cities[i]
+        return (not city['adcode'].endswith('00'), len(city['name']), i)
+
+    def _build(self):
+        cities = []
+        names = set()
+        for name, adcode, _citycode in self.registry.rows():
+            # 跳过表头，同名城市只保留第一条（与 GetCityAdcode 一致）
+            if not str(adcode).isdigit() or name in names:
+                continue
+            names.add(name)
+            cities.append({'name': name, 'adcode': str(adcode)})
+
+        indexes = [_PrefixArray((city['name'].lower(), i) for i, city in enumerate(cities))]
+        if self.pinyin_enabled:
+            full, initials = [], []
+            for i, city in enumerate(cities):
+                full.append((''.join(lazy_pinyin(city['name'])), i))
+                initials.append((''.join(lazy_pinyin(city['name'], style=Style.FIRST_LETTER)), i))
+            indexes.append(_PrefixArray(full))
+            indexes.append(_PrefixArray(initials))
+
+        self._cities = cities
+        self._indexes = indexes
+        self.version = f"{self.registry.version}-{'py' if self.pinyin_enabled else 'zh'}"
+
+
+# 全局搜索索引
+city_search_index = CitySearchIndex()
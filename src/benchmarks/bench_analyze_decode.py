@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片分析解码基准测试：完整解码 + LANCZOS vs JPEG 草稿模式 + BILINEAR
+
+每种模式在独立子进程中运行，以便分别统计峰值内存（ru_maxrss）。
+Linux 下子进程会继承父进程的 ru_maxrss，因此测试图片也在子进程中生成。
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_analyze_decode [次数]
+"""
+import io
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import subprocess
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+from PIL import Image, ImageDraw
+from services.image_analyzer import ImageAnalyzer
+
+
+def make_phone_jpeg(size=(4032, 3024)):
+    """生成一张手机照片尺寸的模拟衣物 JPEG"""
+    img = Image.linear_gradient('L').resize(size).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    draw.rectangle([w // 4, h // 6, w * 3 // 4, h * 5 // 6], fill=(40, 60, 140))
+    draw.ellipse([w // 3, h // 3, w // 2, h // 2], fill=(200, 40, 40))
+    buf = io.BytesIO()
+    img.save(buf, 'JPEG', quality=90)
+    return buf.getvalue()
+
+
+def worker(mode, path, rounds):
+    with open(path, 'rb') as f:
+        data = f.read()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result = None
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = ImageAnalyzer.analyze(io.BytesIO(data), fast=(mode == 'fast'))
+    elapsed = (time.perf_counter() - start) / rounds
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'latency': elapsed, 'peak_kb': peak, 'baseline_kb': baseline, 'result': result}))
+
+
+def run(*args):
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_analyze_decode'] + [str(a) for a in args],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout) if out.stdout else None
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--make':
+        with open(sys.argv[2], 'wb') as f:
+            f.write(make_phone_jpeg())
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'phone.jpg')
+        run('--make', path)
+        full = run('--worker', 'full', path, rounds)
+        fast = run('--worker', 'fast', path, rounds)
+
+    print(f"图片: 4032x3024 JPEG，每种模式 {rounds} 次")
+    for name, r in (('完整解码', full), ('快速模式', fast)):
+        extra_mb = (r['peak_kb'] - r['baseline_kb']) / 1024
+        print(f"{name}: {r['latency'] * 1000:8.2f} ms/张   分析额外峰值内存 {extra_mb:8.1f} MB")
+        print(f"          {r['result']}")
+    print(f"延迟下降: {full['latency'] / fast['latency']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
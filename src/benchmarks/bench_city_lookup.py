@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+城市查询基准测试：每次请求解析 xlsx vs 内存注册表
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_city_lookup
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CITY_DATA_FILE
+from backend.weather.cities import CityRegistry, SHEET_NAME
+
+CITIES = ['北京市', '上海市', '广州市', '深圳市', '路氹填海区']
+
+
+def legacy_lookup(city):
+    """旧实现：每次调用都完整加载工作簿"""
+    from openpyxl import load_workbook
+    wb = load_workbook(CITY_DATA_FILE)
+    ws = wb[SHEET_NAME]
+    for row in ws.iter_rows(values_only=True):
+        if row[0] == str(city):
+            return row[1]
+
+
+def timeit(func, rounds):
+    start = time.perf_counter()
+    for i in range(rounds):
+        func(CITIES[i % len(CITIES)])
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    legacy = timeit(legacy_lookup, 10)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, 'city_cache.json')
+
+        start = time.perf_counter()
+        CityRegistry(cache_file=cache_file).load()
+        cold_xlsx = time.perf_counter() - start
+
+        start = time.perf_counter()
+        registry = CityRegistry(cache_file=cache_file).load()
+        cold_cache = time.perf_counter() - start
+
+        warm = timeit(registry.get_adcode, 100000)
+
+    print(f"旧实现 (每次解析 xlsx):   {legacy * 1000:10.3f} ms/次")
+    print(f"注册表冷启动 (解析 xlsx): {cold_xlsx * 1000:10.3f} ms")
+    print(f"注册表冷启动 (读缓存):    {cold_cache * 1000:10.3f} ms")
+    print(f"注册表查询:               {warm * 1e6:10.3f} us/次")
+    print(f"加速比:                   {legacy / warm:10.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+衣物查询基准测试：迁移 3、4（查询索引、分页索引）前后的查询计划与耗时
+
+先在临时数据库中生成 10 万件衣物（结构停在迁移 2），测量 get_all、
+get_by_temperature 和深分页的 get_page；再升级到最新版本重新测量。升级后用 EXPLAIN QUERY PLAN
+检查每个查询都走索引且不再需要临时排序，不满足时以非零状态退出。
+完整结果的耗时主要花在把行转换成字典上，首行耗时更能体现省掉的排序。
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_clothing_queries [衣物数量] [每个查询的次数]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CLOTHING_TYPES
+from models import database
+from models.database import ClothingModel, db_session
+from models.migrations import migrate
+
+# 深分页的位置：倒序排列时约在列表的 80% 处
+DEEP_CURSOR = ('2024-03-01 00:00:00', 0)
+_deep_cursor = ClothingModel.encode_cursor({'created_at': DEEP_CURSOR[0], 'id': DEEP_CURSOR[1]})
+
+# (名称, 调用, 对应的 SQL 与参数, 升级后应使用的索引)
+QUERIES = [
+    ('get_all(type)', lambda: ClothingModel.get_all('tops'),
+     'SELECT * FROM clothing WHERE type = ? ORDER BY created_at DESC', ('tops',),
+     'idx_clothing_type_page'),
+    ('get_all()', lambda: ClothingModel.get_all(),
+     'SELECT * FROM clothing ORDER BY created_at DESC', (),
+     'idx_clothing_created'),
+    ('get_by_temperature(t, type)', lambda: ClothingModel.get_by_temperature(18, 'tops'),
+     'SELECT * FROM clothing WHERE temp_min <= ? AND temp_max >= ? AND type = ? ORDER BY created_at DESC',
+     (18, 18, 'tops'), 'idx_clothing_type_page'),
+    ('get_by_temperature(t)', lambda: ClothingModel.get_by_temperature(18),
+     'SELECT * FROM clothing WHERE temp_min <= ? AND temp_max >= ? ORDER BY type, created_at DESC',
+     (18, 18), 'idx_clothing_type_page'),
+    ('get_page(type, 深分页)', lambda: ClothingModel.get_page('tops', 48, _deep_cursor),
+     'SELECT * FROM clothing WHERE type = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?',
+     ('tops',) + DEEP_CURSOR + (49,), 'idx_clothing_type_page'),
+    ('get_page(深分页)', lambda: ClothingModel.get_page(None, 48, _deep_cursor),
+     'SELECT * FROM clothing WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?',
+     DEEP_CURSOR + (49,), 'idx_clothing_created'),
+]
+
+
+def populate(conn, count, seed=3):
+    rng = random.Random(seed)
+    types = list(CLOTHING_TYPES)
+    rows = []
+    for i in range(count):
+        low = rng.randint(-15, 30)
+        created = f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:{i % 60:02d}'
+        rows.append((f'衣物{i}', rng.choice(types), 'black', 'casual', low, low + rng.randint(3, 20), created))
+    conn.executemany('''
+        INSERT INTO clothing (name, type, color, style, temp_min, temp_max, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+
+
+def query_plan(sql, params):
+    with db_session() as conn:
+        return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def first_row(sql, params):
+    """只取第一行：不需要排序时可以立即返回，反映分页场景"""
+    with db_session() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def measure(rounds):
+    """返回 {名称: (完整结果 ms, 首行 ms, 查询计划)}"""
+    results = {}
+    for name, call, sql, params, _index in QUERIES:
+        call()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            call()
+        full = (time.perf_counter() - start) / rounds * 1000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            first_row(sql, params)
+        first = (time.perf_counter() - start) / rounds * 1000
+        results[name] = (full, first, query_plan(sql, params))
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        # 测量的是查询本身，关闭查询缓存
+        database.query_cache.max_entries = 0
+        with db_session() as conn:
+            migrate(conn, target=2)
+            populate(conn, count)
+        before = measure(rounds)
+
+        with db_session() as conn:
+            migrate(conn)
+        after = measure(rounds)
+        database.close_connections()
+
+    print(f"衣物数量: {count}，每个查询 {rounds} 次")
+    failures = []
+    for name, _call, _sql, _params, index in QUERIES:
+        (t0, f0, plan0), (t1, f1, plan1) = before[name], after[name]
+        print(f"\n{name}")
+        print(f"    完整结果: {t0:8.2f} ms → {t1:8.2f} ms  ({t0 / t1:.1f}x)")
+        print(f"    首行:     {f0:8.2f} ms → {f1:8.2f} ms  ({f0 / f1:.0f}x)")
+        print(f"    索引前: {'; '.join(plan0)}")
+        print(f"    索引后: {'; '.join(plan1)}")
+        if not any(index in step for step in plan1):
+            failures.append(f"{name} 未使用 {index}")
+        if any('TEMP B-TREE' in step for step in plan1):
+            failures.append(f"{name} 仍需要临时排序")
+
+    if failures:
+        print('\n查询计划检查失败:\n    ' + '\n    '.join(failures))
+        sys.exit(1)
+    print('\n查询计划检查通过')
+
+
+if __name__ == '__main__':
+    main()
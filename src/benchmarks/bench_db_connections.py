@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库连接基准测试：每次查询新建连接 vs 线程复用连接（WAL + PRAGMA）
+
+模拟 /api/recommend 和 /api/wardrobe/summary 两类请求，统计每个请求
+打开的连接数和耗时。两种模式分别使用独立的临时数据库。
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_db_connections [衣物数量] [请求次数]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CLOTHING_TYPES
+from models import database
+from models.database import init_database, ClothingModel, ConnectionManager, release_connection
+from services.recommender import OutfitRecommender
+
+
+class LegacySessions:
+    """旧实现：每次 db_session() 都新建连接，结束时提交并关闭"""
+
+    def __init__(self):
+        self.connects = 0
+
+    @contextmanager
+    def __call__(self):
+        self.connects += 1
+        conn = sqlite3.connect(database.DATABASE_PATH)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def populate(count, seed=1):
+    rng = random.Random(seed)
+    types = list(CLOTHING_TYPES)
+    for i in range(count):
+        low = rng.randint(-10, 25)
+        ClothingModel.add(f'衣物{i}', rng.choice(types), rng.choice(['black', 'white', 'blue', 'red']),
+                          'casual', low, low + rng.randint(5, 20))
+
+
+def run_requests(requests, connects):
+    """返回 {请求类型: (每请求连接数, 每请求毫秒)}"""
+    results = {}
+    for name, handler in (('recommend', lambda: OutfitRecommender.recommend(random.randint(-5, 30))),
+                          ('summary', OutfitRecommender.get_wardrobe_summary)):
+        before = connects()
+        start = time.perf_counter()
+        for _ in range(requests):
+            handler()
+            release_connection()
+        elapsed = time.perf_counter() - start
+        results[name] = ((connects() - before) / requests, elapsed / requests * 1000)
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    original_session = database.db_session
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 旧实现
+        database.DATABASE_PATH = os.path.join(tmp, 'legacy.db')
+        legacy = LegacySessions()
+        database.db_session = legacy
+        init_database()
+        populate(count)
+        before = run_requests(requests, lambda: legacy.connects)
+
+        # 连接复用
+        database.DATABASE_PATH = os.path.join(tmp, 'pooled.db')
+        manager = ConnectionManager()
+        database.connection_manager = manager
+        database.db_session = original_session
+        database.temperature_index.invalidate()
+        database.query_cache.clear()
+        init_database()
+        populate(count)
+        release_connection()
+        after = run_requests(requests, lambda: manager.stats()['connects'])
+        manager.close_all()
+
+    print(f"衣物数量: {count}，每类请求 {requests} 次")
+    print(f"{'请求':<12}{'连接数/请求（前→后）':<24}{'ms/请求（前→后）':<24}{'加速比':>8}")
+    for name in before:
+        (c0, t0), (c1, t1) = before[name], after[name]
+        print(f"{name:<12}{f'{c0:.2f} → {c1:.2f}':<24}{f'{t0:.3f} → {t1:.3f}':<24}{t0 / t1:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主要颜色提取基准测试：逐像素 Python 循环 vs NumPy 向量化
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_dominant_colors [图片数量]
+"""
+import os
+import sys
+import time
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+from services.image_analyzer import ImageAnalyzer
+
+
+def legacy_extract(img, num_colors=5):
+    """旧实现：getdata() + Counter"""
+    img_small = img.resize((100, 100), Image.Resampling.LANCZOS)
+    pixels = list(img_small.getdata())
+    filtered_pixels = []
+    for pixel in pixels:
+        r, g, b = pixel[:3]
+        brightness = (r + g + b) / 3
+        if 20 < brightness < 240:
+            filtered_pixels.append((r, g, b))
+    if not filtered_pixels:
+        filtered_pixels = [(r, g, b) for r, g, b, *_ in [p if len(p) >= 3 else (p[0], p[0], p[0]) for p in pixels[:100]]]
+    quantized = []
+    for r, g, b in filtered_pixels:
+        quantized.append(((r // 32) * 32, (g // 32) * 32, (b // 32) * 32))
+    return [color for color, count in Counter(quantized).most_common(num_colors)]
+
+
+def make_corpus(count, seed=42):
+    """生成模拟衣物照片：浅色背景 + 若干色块，另有一成随机噪点图"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        w, h = rng.choice([(400, 600), (600, 400), (300, 300), (800, 800)])
+        if i % 10 == 9:
+            corpus.append(Image.frombytes('RGB', (w, h), rng.randbytes(w * h * 3)))
+            continue
+        bg = tuple(rng.randint(200, 255) for _ in range(3))
+        img = Image.new('RGB', (w, h), bg)
+        draw = ImageDraw.Draw(img)
+        for _ in range(rng.randint(1, 4)):
+            x0, y0 = rng.randint(0, w // 2), rng.randint(0, h // 2)
+            x1, y1 = rng.randint(x0 + 10, w), rng.randint(y0 + 10, h)
+            draw.rectangle([x0, y0, x1, y1], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+        corpus.append(img)
+    # 极端情况：纯白 / 纯黑图片走回退分支
+    corpus[0] = Image.new('RGB', (200, 200), (255, 255, 255))
+    corpus[1] = Image.new('RGB', (200, 200), (0, 0, 0))
+    return corpus
+
+
+def bench(func, corpus):
+    start = time.perf_counter()
+    results = [func(img) for img in corpus]
+    return results, (time.perf_counter() - start) / len(corpus)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    corpus = make_corpus(count)
+
+    legacy_results, legacy_time = bench(legacy_extract, corpus)
+    new_results, new_time = bench(lambda img: ImageAnalyzer._extract_dominant_colors(img, engine='histogram'), corpus)
+
+    _, resize_time = bench(lambda img: img.resize((100, 100), Image.Resampling.LANCZOS), corpus)
+
+    mismatches = sum(1 for a, b in zip(legacy_results, new_results) if a != b)
+    print(f"图片数量:       {count}")
+    print(f"旧实现:         {legacy_time * 1000:8.3f} ms/张")
+    print(f"向量化实现:     {new_time * 1000:8.3f} ms/张")
+    print(f"加速比:         {legacy_time / new_time:8.2f}x")
+    print(f"其中缩放耗时:   {resize_time * 1000:8.3f} ms/张")
+    print(f"颜色统计加速比: {(legacy_time - resize_time) / (new_time - resize_time):8.2f}x")
+    print(f"结果不一致:     {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
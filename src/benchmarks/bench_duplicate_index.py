@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重复检测索引基准测试：每次写入后整体重建 vs 写入时就地修补
+
+模拟上传流水线：每次上传先新增衣物，再按感知哈希查找近似重复，最后写回哈希。
+旧实现在衣橱版本号变化后整体重建 BK-tree，每次上传都要重建；新实现由
+ClothingModel 按ID就地增删，只有其他进程写入时才重建。
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_duplicate_index [上传次数]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import database
+from models.database import init_database, db_session, ClothingModel, duplicate_index
+
+SIZES = (10000, 50000)
+
+
+def random_hash(rng):
+    return f'{rng.getrandbits(64):016x}'
+
+
+def populate(count, seed=3):
+    rng = random.Random(seed)
+    rows = [(f'衣物{i}', 'tops', random_hash(rng)) for i in range(count)]
+    with db_session() as conn:
+        conn.executemany('INSERT INTO clothing (name, type, phash) VALUES (?, ?, ?)', rows)
+
+
+def uploads(count, rebuild, seed=7):
+    """返回每次上传的毫秒数"""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for i in range(count):
+        clothing_id = ClothingModel.add(f'上传{i}', 'tops')
+        phash = random_hash(rng)
+        if rebuild:
+            duplicate_index.invalidate()
+        duplicate_index.find(phash, exclude=clothing_id)
+        ClothingModel.update(clothing_id, phash=phash)
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"每种实现 {count} 次上传")
+    print(f"{'衣物数量':<10}{'整体重建 ms':>14}{'就地修补 ms':>14}{'加速比':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            database.DATABASE_PATH = os.path.join(tmp, f'dedup_{size}.db')
+            duplicate_index.invalidate()
+            init_database()
+            populate(size)
+
+            t0 = uploads(count, rebuild=True)
+            duplicate_index.find(random_hash(random.Random()))
+            t1 = uploads(count, rebuild=False)
+            assert sorted(duplicate_index._hashes.items()) == sorted(ClothingModel.get_phashes())
+            print(f"{size:<10}{t0:>14.2f}{t1:>14.3f}{t0 / t1:>9.0f}x")
+            database.close_connections()
+
+
+if __name__ == '__main__':
+    main()
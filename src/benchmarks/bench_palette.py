@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主色调提取引擎基准测试：准确率 + 单张耗时
+
+测试集为按固定种子生成的带标注衣物图片：纯色或带纹理的背景上画一件
+带明暗渐变、噪点的衣服，再经过 JPEG 压缩。标注为衣服底色的颜色名称，
+引擎返回的第一个颜色分类正确即计为命中。
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_palette [图片数量]
+"""
+import io
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from services.color_table import classify_rgb, color_table
+from services.image_analyzer import ImageAnalyzer
+from services.palette import PALETTE_ENGINES, extract_palette
+
+# 每个标注颜色的若干底色（均已确认 classify_rgb 结果与标注一致）
+BASE_COLORS = {
+    'red': [(190, 30, 35), (220, 50, 60), (150, 20, 25)],
+    'orange': [(230, 120, 30), (245, 150, 60)],
+    'yellow': [(235, 200, 40), (250, 225, 90)],
+    'green': [(40, 140, 60), (90, 160, 70), (20, 90, 50)],
+    'blue': [(40, 90, 200), (70, 140, 220)],
+    'purple': [(110, 50, 170), (140, 80, 190)],
+    'pink': [(230, 100, 170), (240, 140, 190)],
+    'black': [(20, 20, 25), (35, 30, 30)],
+    'white': [(245, 245, 242), (235, 238, 240)],
+    'gray': [(128, 128, 130), (90, 92, 95), (170, 170, 168)],
+    'brown': [(140, 100, 70), (120, 85, 60)],
+    'beige': [(225, 205, 170), (215, 195, 160)],
+    'navy': [(25, 35, 90), (30, 45, 110)],
+}
+
+BACKGROUNDS = [(250, 250, 250), (236, 236, 236), (205, 210, 215), (60, 60, 60), (180, 150, 110)]
+
+
+def _shirt(draw, w, h, fill):
+    """画一件 T 恤的轮廓"""
+    cx = w / 2
+    points = [
+        (cx - w * 0.12, h * 0.12), (cx - w * 0.32, h * 0.2), (cx - w * 0.42, h * 0.38),
+        (cx - w * 0.3, h * 0.44), (cx - w * 0.26, h * 0.36), (cx - w * 0.26, h * 0.88),
+        (cx + w * 0.26, h * 0.88), (cx + w * 0.26, h * 0.36), (cx + w * 0.3, h * 0.44),
+        (cx + w * 0.42, h * 0.38), (cx + w * 0.32, h * 0.2), (cx + w * 0.12, h * 0.12),
+    ]
+    draw.polygon(points, fill=fill)
+
+
+def make_fixtures(count, seed=7):
+    """生成带标注的测试图片，返回 [(JPEG 字节, 标注), ...]"""
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    labels = sorted(BASE_COLORS)
+    fixtures = []
+    for i in range(count):
+        label = labels[i % len(labels)]
+        base = rng.choice(BASE_COLORS[label])
+        assert classify_rgb(base) == label, (base, label)
+
+        w, h = rng.choice([(600, 800), (800, 800), (900, 1200)])
+        bg = rng.choice([c for c in BACKGROUNDS if abs(sum(c) - sum(base)) > 90])
+        if i % 3 == 2:
+            # 带光照渐变和纹理的背景（例如床单、地板）
+            light = np.linspace(0.9, 1.1, w)[None, :, None]
+            texture = np.clip(np.array(bg) * light + np_rng.normal(0, 10, (h, w, 3)), 0, 255)
+            img = Image.fromarray(texture.astype(np.uint8))
+        else:
+            img = Image.new('RGB', (w, h), bg)
+        mask = Image.new('L', (w, h), 0)
+        _shirt(ImageDraw.Draw(mask), w, h, 255)
+
+        # 衣服：从上到下的明暗渐变 + 噪点 + 一块小的印花
+        shade = np.linspace(1.08, 0.9, h)[:, None, None]
+        garment = np.clip(np.array(base, dtype=np.float64) * shade + np_rng.normal(0, 6, (h, w, 3)), 0, 255)
+        garment = Image.fromarray(garment.astype(np.uint8))
+        logo = ImageDraw.Draw(garment)
+        logo.rectangle([w * 0.44, h * 0.3, w * 0.56, h * 0.38], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+        img.paste(garment, (0, 0), mask)
+
+        buf = io.BytesIO()
+        img.save(buf, 'JPEG', quality=85)
+        fixtures.append((buf.getvalue(), label))
+    return fixtures
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 130
+    fixtures = make_fixtures(count)
+    thumbnails = [
+        np.asarray(ImageAnalyzer._make_thumbnail(Image.open(io.BytesIO(data)), fast=True))
+        for data, _ in fixtures
+    ]
+
+    print(f"测试图片: {count} 张，{len(BASE_COLORS)} 种标注颜色")
+    print(f"{'引擎':<12}{'准确率':>10}{'耗时 ms/张':>14}{'p95 ms':>10}")
+    for engine in PALETTE_ENGINES:
+        hits = 0
+        times = []
+        errors = {}
+        for pixels, (_, label) in zip(thumbnails, fixtures):
+            start = time.perf_counter()
+            palette = extract_palette(pixels, 5, engine)
+            times.append(time.perf_counter() - start)
+            name = color_table.name(palette[0]) if palette else None
+            if name == label:
+                hits += 1
+            else:
+                errors[label] = errors.get(label, 0) + 1
+        times.sort()
+        p95 = times[int(len(times) * 0.95) - 1]
+        print(f"{engine:<12}{hits / count:>10.1%}{sum(times) / count * 1000:>14.2f}{p95 * 1000:>10.2f}")
+        if errors:
+            print(f"{'':<12}误判: {', '.join(f'{k}×{v}' for k, v in sorted(errors.items()))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+衣物查询缓存基准测试：关闭缓存 vs 按衣橱版本号失效的 LRU 缓存
+
+模拟读多写少的负载：每个请求随机执行 get_all / get_by_id / get_by_temperature /
+get_statistics 之一，每隔若干请求修改一件衣物使缓存失效。比较两种模式的
+平均耗时，并输出缓存命中率。
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_query_cache [衣物数量] [请求次数] [每多少个请求写一次]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CLOTHING_TYPES, QUERY_CACHE_MAX_ENTRIES
+from models import database
+from models.database import init_database, db_session, ClothingModel, query_cache
+
+
+def populate(count, seed=9):
+    rng = random.Random(seed)
+    types = list(CLOTHING_TYPES)
+    rows = []
+    for i in range(count):
+        low = rng.randint(-15, 30)
+        rows.append((f'衣物{i}', rng.choice(types), low, low + rng.randint(3, 20)))
+    with db_session() as conn:
+        conn.executemany('INSERT INTO clothing (name, type, temp_min, temp_max) VALUES (?, ?, ?, ?)', rows)
+
+
+def workload(count, requests, write_every, seed=11):
+    """返回每请求毫秒数"""
+    rng = random.Random(seed)
+    types = list(CLOTHING_TYPES)
+    reads = [
+        lambda: ClothingModel.get_all(),
+        lambda: ClothingModel.get_all(rng.choice(types)),
+        lambda: ClothingModel.get_by_id(rng.randint(1, 50)),
+        lambda: ClothingModel.get_by_temperature(rng.choice([0, 8, 15, 22, 30])),
+        lambda: ClothingModel.get_statistics(),
+    ]
+    start = time.perf_counter()
+    for i in range(1, requests + 1):
+        rng.choice(reads)()
+        if i % write_every == 0:
+            ClothingModel.update(rng.randint(1, count), name=f'改名{i}')
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    write_every = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        init_database()
+        populate(count)
+
+        query_cache.max_entries = 0
+        before = workload(count, requests, write_every)
+
+        query_cache.max_entries = QUERY_CACHE_MAX_ENTRIES
+        query_cache.clear()
+        baseline = query_cache.stats()
+        after = workload(count, requests, write_every)
+        stats = {k: v - baseline[k] for k, v in query_cache.stats().items()
+                 if k in ('hits', 'misses', 'invalidations', 'evictions')}
+        database.close_connections()
+
+    print(f"衣物数量: {count}，{requests} 次请求，每 {write_every} 次请求写入一次")
+    print(f"关闭缓存: {before:8.3f} ms/请求")
+    print(f"查询缓存: {after:8.3f} ms/请求  ({before / after:.1f}x)")
+    print(f"命中率: {stats['hits'] / requests:.1%}  命中 {stats['hits']}  未命中 {stats['misses']}  "
+          f"失效 {stats['invalidations']}  淘汰 {stats['evictions']}")
+
+
+if __name__ == '__main__':
+    main()
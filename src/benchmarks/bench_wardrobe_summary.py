@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+衣橱概况基准测试：逐次全表统计 vs 触发器维护的汇总表
+
+旧实现每次请求都 GROUP BY 统计类型、读取整张衣物表取最近5件、按温度档位
+逐一统计；新实现只读取汇总表和 LIMIT 5 的最近衣物。在不同衣橱大小下
+比较单次耗时，新实现的耗时应基本不随衣物数量变化。
+
+用法（在 src 目录下）:
+    python -m benchmarks.bench_wardrobe_summary [请求次数]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CLOTHING_TYPES, TEMPERATURE_RANGES
+from models import database
+from models.database import init_database, db_session, row_to_dict
+from services.recommender import OutfitRecommender
+
+SIZES = (1000, 10000, 100000)
+
+
+def legacy_summary():
+    """旧实现：统计查询 + 全表读取 + 每个温度档位一次查询"""
+    with db_session() as conn:
+        by_type = {row['type']: row['count'] for row in
+                   conn.execute('SELECT type, COUNT(*) AS count FROM clothing GROUP BY type')}
+        total = conn.execute('SELECT COUNT(*) FROM clothing').fetchone()[0]
+        all_items = [row_to_dict(row) for row in conn.execute('SELECT * FROM clothing ORDER BY created_at DESC')]
+        coverage = {}
+        for level, range_info in TEMPERATURE_RANGES.items():
+            mid_temp = (range_info['min'] + range_info['max']) / 2
+            items = conn.execute('SELECT type FROM clothing WHERE temp_min <= ? AND temp_max >= ?',
+                                 (mid_temp, mid_temp)).fetchall()
+            coverage[level] = {
+                'count': len(items),
+                'has_complete_outfit': OutfitRecommender._check_complete_outfit(items)
+            }
+    return {'statistics': {'total': total, 'by_type': by_type},
+            'temperature_coverage': coverage, 'recent_items': all_items[:5]}
+
+
+def populate(count, seed=5):
+    rng = random.Random(seed)
+    types = list(CLOTHING_TYPES)
+    rows = []
+    for i in range(count):
+        low = rng.randint(-15, 30)
+        rows.append((f'衣物{i}', rng.choice(types), low, low + rng.randint(3, 20)))
+    with db_session() as conn:
+        conn.executemany('INSERT INTO clothing (name, type, temp_min, temp_max) VALUES (?, ?, ?, ?)', rows)
+
+
+def timed(func, requests):
+    func()
+    start = time.perf_counter()
+    for _ in range(requests):
+        func()
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"每种实现 {requests} 次请求")
+    print(f"{'衣物数量':<10}{'旧实现 ms':>12}{'汇总表 ms':>12}{'加速比':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            database.DATABASE_PATH = os.path.join(tmp, f'summary_{size}.db')
+            init_database()
+            populate(size)
+
+            new = OutfitRecommender.get_wardrobe_summary()
+            old = legacy_summary()
+            assert new['statistics'] == old['statistics']
+            for level, info in old['temperature_coverage'].items():
+                assert new['temperature_coverage'][level]['count'] == info['count']
+                assert new['temperature_coverage'][level]['has_complete_outfit'] == info['has_complete_outfit']
+
+            t0 = timed(legacy_summary, requests)
+            t1 = timed(OutfitRecommender.get_wardrobe_summary, requests)
+            print(f"{size:<10}{t0:>12.2f}{t1:>12.3f}{t0 / t1:>9.0f}x")
+            database.close_connections()
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,18 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # 数据库配置
 DATABASE_PATH = os.path.join(BASE_DIR, 'wardrobe.db')
+DB_POOL_SIZE = 8  # 请求结束后保留的空闲连接数
+DB_CACHE_SIZE_KB = 8 * 1024  # 每个连接的页缓存
+DB_MMAP_SIZE = 64 * 1024 * 1024  # 内存映射读取的大小
+DB_BUSY_TIMEOUT_MS = 5000  # 等待写锁的时间
+DB_STATEMENT_CACHE = 128  # 每个连接缓存的预编译语句数
+
+# 衣物查询缓存：按衣橱版本号失效，最多保留的查询结果数
+QUERY_CACHE_MAX_ENTRIES = 256
+
+# 衣物列表分页
+CLOTHING_PAGE_SIZE = 48
+CLOTHING_PAGE_MAX = 200
 
 # 上传配置
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
@@ -63,3 +75,73 @@ COLORS = {
 # 天气API配置
 WEATHER_API_KEY_FILE = os.path.join(BASE_DIR, 'backend', 'weather', '.api_key')
 CITY_DATA_FILE = os.path.join(BASE_DIR, 'backend', 'weather', 'AMap_adcode_citycode.xlsx')
+CITY_CACHE_FILE = os.path.join(BASE_DIR, 'backend', 'weather', '.city_cache.json')
+
+# 天气缓存配置（秒）- 高德实况数据约每30分钟更新一次
+WEATHER_CACHE_TTL = 15 * 60
+WEATHER_CACHE_STALE_TTL = 60 * 60
+
+# 天气API客户端配置
+WEATHER_API_BASE_URL = 'https://restapi.amap.com'
+WEATHER_CONNECT_TIMEOUT = 3.05  # 秒
+WEATHER_READ_TIMEOUT = 5
+WEATHER_MAX_RETRIES = 2
+WEATHER_RETRY_BACKOFF = 0.2  # 秒，实际等待为 [0, backoff * 2^n] 内的随机值
+WEATHER_POOL_SIZE = 10
+WEATHER_BREAKER_THRESHOLD = 5  # 连续失败次数
+WEATHER_BREAKER_RESET = 30  # 熔断冷却时间（秒）
+
+# 批量天气查询
+WEATHER_BATCH_WORKERS = 8
+WEATHER_BATCH_MAX_CITIES = 20
+
+# 城市搜索
+CITY_SEARCH_DEFAULT_LIMIT = 10
+CITY_SEARCH_MAX_LIMIT = 50
+CITY_SEARCH_MAX_AGE = 24 * 60 * 60  # 秒
+
+# 热门城市天气预取
+WEATHER_PREFETCH_INTERVAL = 60  # 调度间隔（秒）
+WEATHER_PREFETCH_TOP_N = 20  # 每轮最多预取的热门城市数
+WEATHER_PREFETCH_LEAD = 120  # 距离缓存过期多少秒内开始刷新
+WEATHER_PREFETCH_BUDGET = 200  # 每小时最多发起的预取请求数
+WEATHER_PREFETCH_DECAY = 0.95  # 每轮热度衰减系数
+
+# 天气预报缓存配置（秒）- 高德预报数据每天更新数次
+WEATHER_FORECAST_TTL = 3 * 60 * 60
+WEATHER_FORECAST_STALE_TTL = 6 * 60 * 60
+FORECAST_MAX_DAY = 3  # 预报最多覆盖今天之后3天
+
+# 图片分析：快速模式下 JPEG 按缩小比例解码，颜色结果与完整解码略有差异
+IMAGE_ANALYSIS_FAST_MODE = True
+
+# 主色调提取引擎: histogram / kmeans / median_cut（见 services/palette.py）
+# 默认使用 histogram：结果与原算法一致，且颜色落在量化格点上，可直接查颜色表；
+# kmeans / median_cut 需显式启用，其簇中心不在格点上，颜色命名会逐个计算
+PALETTE_ENGINE = 'histogram'
+PALETTE_KMEANS_ITERATIONS = 10  # 固定迭代次数，保证单张分析耗时可控
+PALETTE_KMEANS_BATCH = 1024  # 每次迭代的样本数
+
+# 图片分析结果缓存（按内容哈希）最多保留的条目数
+ANALYSIS_CACHE_MAX_ENTRIES = 10000
+
+# 批量导入
+BULK_IMPORT_BATCH_SIZE = 200  # 每个事务插入的条数
+
+# 上传后台处理队列
+UPLOAD_WORKERS = 2  # 工作线程数
+UPLOAD_QUEUE_SIZE = 100  # 最多排队的任务数，超出时上传接口返回503
+UPLOAD_JOB_HISTORY = 1000  # 内存中保留的任务状态条数
+
+# 推荐历史记录：先写入内存缓冲区，由后台线程批量写库
+HISTORY_BUFFER_SIZE = 10000  # 缓冲区上限，写满后新记录丢弃并计数
+HISTORY_FLUSH_SIZE = 200  # 缓冲区达到该条数时立即写库
+HISTORY_FLUSH_INTERVAL = 5  # 最长写库间隔（秒）
+
+# 缩略图配置
+THUMBNAIL_FOLDER = os.path.join(BASE_DIR, 'static', 'thumbs')
+THUMBNAIL_WIDTHS = (160, 480, 1080)
+THUMBNAIL_MAX_AGE = 365 * 24 * 60 * 60  # 文件名带内容指纹，可长期缓存
+
+# 重复检测：感知哈希汉明距离不超过该值视为疑似重复（64位）
+DUPLICATE_MAX_DISTANCE = 10
@@ -5,90 +5,211 @@ SQLite数据库模型
 """
 import sqlite3
 import os
+import json
+import base64
+import time
+import threading
 from datetime import datetime
 from contextlib import contextmanager
-from config import DATABASE_PATH
+from config import (
+    DATABASE_PATH, DB_POOL_SIZE, DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_BUSY_TIMEOUT_MS,
+    DB_STATEMENT_CACHE, TEMPERATURE_RANGES, QUERY_CACHE_MAX_ENTRIES
+)
+from models.migrations import migrate
+from models.temperature_index import TemperatureIndex
+from models.phash_index import PhashIndex
+from models.query_cache import QueryCache
 
 def get_db_connection():
-    """获取数据库连接"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    """新建一个数据库连接（WAL 模式，已设置 PRAGMA）"""
+    conn = sqlite3.connect(DATABASE_PATH, timeout=DB_BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=DB_STATEMENT_CACHE, check_same_thread=False)
     conn.row_factory = sqlite3.Row  # 返回字典形式的结果
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KB}')
+    conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+    conn.execute('PRAGMA temp_store = MEMORY')
     return conn
 
-@contextmanager
+class _ThreadConnection:
+    """线程持有的连接，线程结束时随 threading.local 一起回收并关闭连接"""
+    
+    def __init__(self, manager, conn):
+        self.manager = manager
+        self.conn = conn
+        self.pid = os.getpid()
+        self.depth = 0
+    
+    def __del__(self):
+        if self.conn is not None:
+            self.manager._close(self.conn)
+
+class ConnectionManager:
+    """
+    数据库连接管理
+    
+    每个线程复用同一个连接；请求线程在请求结束时调用 release() 把连接放回空闲池，
+    下一个请求线程直接取用。后台线程一直持有自己的连接，线程结束时自动关闭。
+    """
+    
+    def __init__(self, pool_size=DB_POOL_SIZE):
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle = []
+        self._open = {}
+        self._stats = {'connects': 0, 'reuses': 0}
+    
+    def _holder(self):
+        """当前线程的连接，没有时从空闲池取出或新建"""
+        holder = getattr(self._local, 'holder', None)
+        # fork 出的子进程不能沿用父进程的连接
+        if holder is not None and holder.pid == os.getpid():
+            return holder
+        
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                self._stats['reuses'] += 1
+        if conn is None:
+            conn = get_db_connection()
+            with self._lock:
+                self._open[id(conn)] = conn
+                self._stats['connects'] += 1
+        holder = self._local.holder = _ThreadConnection(self, conn)
+        return holder
+    
+    @contextmanager
+    def session(self):
+        """
+        事务会话：最外层会话正常结束时提交，出错时回滚；嵌套会话并入外层事务
+        """
+        holder = self._holder()
+        conn = holder.conn
+        holder.depth += 1
+        try:
+            yield conn
+            if holder.depth == 1:
+                conn.commit()
+        except Exception:
+            if holder.depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            holder.depth -= 1
+    
+    def release(self):
+        """把当前线程的连接放回空闲池（请求结束时调用）"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            return
+        self._local.holder = None
+        conn, holder.conn = holder.conn, None
+        if holder.pid != os.getpid():
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+    
+    def close_all(self):
+        """关闭全部连接（进程退出时调用）"""
+        with self._lock:
+            conns = list(self._open.values())
+            self._open.clear()
+            self._idle.clear()
+        self._local = threading.local()
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(open=len(self._open), idle=len(self._idle))
+        return stats
+    
+    def _close(self, conn):
+        with self._lock:
+            self._open.pop(id(conn), None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+# 全局连接管理器
+connection_manager = ConnectionManager()
+
 def db_session():
     """数据库会话上下文管理器"""
-    conn = get_db_connection()
-    try:
-        yield conn
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    return connection_manager.session()
+
+def release_connection():
+    """请求结束时归还当前线程的连接"""
+    connection_manager.release()
+
+def close_connections():
+    """关闭全部数据库连接"""
+    connection_manager.close_all()
+
+# 以JSON文本存储的列
+JSON_COLUMNS = ('thumbnails',)
+
+def pack_palette(colors):
+    """十六进制颜色列表打包为 BLOB（每个颜色3字节）"""
+    return b''.join(bytes.fromhex(c.lstrip('#')) for c in colors)
+
+def unpack_palette(blob):
+    """BLOB 还原为十六进制颜色列表"""
+    return ['#' + blob[i:i + 3].hex() for i in range(0, len(blob), 3)]
+
+def row_to_dict(row):
+    """数据库行转字典，并解析JSON列和调色板"""
+    item = dict(row)
+    for column in JSON_COLUMNS:
+        if item.get(column):
+            item[column] = json.loads(item[column])
+    if item.get('palette'):
+        item['palette'] = unpack_palette(item['palette'])
+    return item
 
 def init_database():
-    """初始化数据库表"""
+    """初始化数据库表，并执行尚未应用的结构迁移"""
     with db_session() as conn:
-        cursor = conn.cursor()
-        
-        # 衣物表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clothing (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                color TEXT,
-                style TEXT,
-                temp_min INTEGER DEFAULT 0,
-                temp_max INTEGER DEFAULT 40,
-                image_path TEXT,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 穿搭组合表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS outfits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                top_id INTEGER,
-                bottom_id INTEGER,
-                outerwear_id INTEGER,
-                shoes_id INTEGER,
-                accessories_id INTEGER,
-                temp_min INTEGER,
-                temp_max INTEGER,
-                style TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (top_id) REFERENCES clothing(id),
-                FOREIGN KEY (bottom_id) REFERENCES clothing(id),
-                FOREIGN KEY (outerwear_id) REFERENCES clothing(id),
-                FOREIGN KEY (shoes_id) REFERENCES clothing(id),
-                FOREIGN KEY (accessories_id) REFERENCES clothing(id)
-            )
-        ''')
-        
-        # 推荐历史表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS recommendation_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                temperature REAL,
-                weather TEXT,
-                city TEXT,
-                outfit_ids TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
+        migrate(conn)
+        WardrobeSummaryModel.sync_levels(conn)
         print("数据库初始化完成")
 
+def _generation(conn):
+    """衣橱版本号（clothing 表每次写入由触发器加一）"""
+    return conn.execute('SELECT generation FROM wardrobe_generation WHERE id = 1').fetchone()[0]
+
+def wardrobe_generation():
+    """读取当前衣橱版本号"""
+    with db_session() as conn:
+        return _generation(conn)
+
+# 衣物查询缓存，所有进程通过数据库中的版本号感知写入
+query_cache = QueryCache(wardrobe_generation, QUERY_CACHE_MAX_ENTRIES)
+
 class ClothingModel:
     """衣物数据模型"""
     
+    # 列表接口可选择返回的列
+    LIST_FIELDS = ('id', 'name', 'type', 'color', 'style', 'temp_min', 'temp_max', 'image_path',
+                   'description', 'thumbnails', 'phash', 'palette', 'width', 'height',
+                   'content_hash', 'analyzer_version', 'created_at', 'updated_at')
+    
+    # 推荐候选只需要评分和展示用到的列
+    CANDIDATE_COLUMNS = ('id', 'name', 'type', 'color', 'style', 'temp_min', 'temp_max',
+                         'image_path', 'thumbnails', 'palette')
+    
     @staticmethod
     def add(name, clothing_type, color=None, style=None, temp_min=0, temp_max=40, 
             image_path=None, description=None):
@@ -99,30 +220,131 @@ class ClothingModel:
                 INSERT INTO clothing (name, type, color, style, temp_min, temp_max, image_path, description)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (name, clothing_type, color, style, temp_min, temp_max, image_path, description))
-            return cursor.lastrowid
+            clothing_id = cursor.lastrowid
+            generation = _generation(conn)
+        temperature_index.put(clothing_id, clothing_type, temp_min, temp_max, generation)
+        duplicate_index.touch(generation)
+        return clothing_id
     
     @staticmethod
+    @query_cache.cached
     def get_by_id(clothing_id):
         """根据ID获取衣物"""
         with db_session() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM clothing WHERE id = ?', (clothing_id,))
             row = cursor.fetchone()
-            return dict(row) if row else None
+            return row_to_dict(row) if row else None
+    
+    @staticmethod
+    def get_by_ids(clothing_ids):
+        """
+        一次查询获取多件衣物
+        
+        Returns:
+            dict: {衣物ID: 衣物}，不存在的ID不包含在内
+        """
+        clothing_ids = list(dict.fromkeys(clothing_ids))
+        if not clothing_ids:
+            return {}
+        with db_session() as conn:
+            cursor = conn.cursor()
+            # 通过 json_each 传入ID列表，避免超出 SQL 参数个数上限
+            cursor.execute('''
+                SELECT * FROM clothing WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(clothing_ids),))
+            return {row['id']: row_to_dict(row) for row in cursor.fetchall()}
     
     @staticmethod
-    def get_all(clothing_type=None):
-        """获取所有衣物，可按类型筛选"""
+    @query_cache.cached
+    def get_all(clothing_type=None, fields=None):
+        """
+        获取所有衣物，可按类型筛选
+        
+        Args:
+            clothing_type: 按类型筛选（可选）
+            fields: 需要返回的列（LIST_FIELDS 的子集，元组），为空时返回全部列
+        """
+        columns = ', '.join(ClothingModel.select_columns(fields)) if fields else '*'
         with db_session() as conn:
             cursor = conn.cursor()
             if clothing_type:
-                cursor.execute('SELECT * FROM clothing WHERE type = ? ORDER BY created_at DESC', 
+                cursor.execute(f'SELECT {columns} FROM clothing WHERE type = ? ORDER BY created_at DESC', 
                              (clothing_type,))
             else:
-                cursor.execute('SELECT * FROM clothing ORDER BY created_at DESC')
-            return [dict(row) for row in cursor.fetchall()]
+                cursor.execute(f'SELECT {columns} FROM clothing ORDER BY created_at DESC')
+            return [row_to_dict(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def select_columns(fields):
+        """校验接口请求的字段，返回列名列表；包含不支持的字段时抛出 ValueError"""
+        columns = list(dict.fromkeys(fields or ClothingModel.LIST_FIELDS))
+        unknown = set(columns) - set(ClothingModel.LIST_FIELDS)
+        if unknown:
+            raise ValueError(f"不支持的字段: {', '.join(sorted(unknown))}")
+        return columns
+    
+    @staticmethod
+    def encode_cursor(item):
+        """由一页的最后一行生成下一页的游标"""
+        raw = json.dumps([item['created_at'], item['id']])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """解析游标，格式错误时抛出 ValueError"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, clothing_id = json.loads(raw)
+        except Exception:
+            raise ValueError('无效的分页游标')
+        if not isinstance(created_at, str) or not isinstance(clothing_id, int):
+            raise ValueError('无效的分页游标')
+        return created_at, clothing_id
+    
+    @staticmethod
+    def get_page(clothing_type=None, limit=50, cursor=None, fields=None):
+        """
+        按 (created_at, id) 倒序分页获取衣物（keyset 分页，不统计总数）
+        
+        Args:
+            clothing_type: 按类型筛选（可选）
+            limit: 每页条数
+            cursor: 上一页返回的游标，为空时从第一页开始
+            fields: 需要返回的列（LIST_FIELDS 的子集），为空时返回全部列
+            
+        Returns:
+            tuple: (衣物列表, 下一页游标；没有下一页时为 None)
+        """
+        columns = ClothingModel.select_columns(fields)
+        # 游标需要 created_at 和 id
+        selected = list(dict.fromkeys(columns + ['created_at', 'id']))
+        
+        conditions, params = [], []
+        if clothing_type:
+            conditions.append('type = ?')
+            params.append(clothing_type)
+        if cursor:
+            conditions.append('(created_at, id) < (?, ?)')
+            params.extend(ClothingModel.decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        
+        with db_session() as conn:
+            cursor_ = conn.cursor()
+            cursor_.execute(f'''
+                SELECT {', '.join(selected)} FROM clothing {where}
+                ORDER BY created_at DESC, id DESC LIMIT ?
+            ''', params + [limit + 1])
+            rows = [row_to_dict(row) for row in cursor_.fetchall()]
+        
+        next_cursor = ClothingModel.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        items = rows[:limit]
+        if len(selected) != len(columns):
+            items = [{k: item[k] for k in columns} for item in items]
+        return items, next_cursor
     
     @staticmethod
+    @query_cache.cached
     def get_by_temperature(temperature, clothing_type=None):
         """根据温度获取适合的衣物"""
         with db_session() as conn:
@@ -139,14 +361,20 @@ class ClothingModel:
                     WHERE temp_min <= ? AND temp_max >= ?
                     ORDER BY type, created_at DESC
                 ''', (temperature, temperature))
-            return [dict(row) for row in cursor.fetchall()]
+            return [row_to_dict(row) for row in cursor.fetchall()]
     
     @staticmethod
     def update(clothing_id, **kwargs):
         """更新衣物信息"""
         allowed_fields = ['name', 'type', 'color', 'style', 'temp_min', 'temp_max', 
-                         'image_path', 'description']
+                         'image_path', 'description', 'thumbnails', 'phash',
+                         'palette', 'width', 'height', 'content_hash', 'analyzer_version']
         updates = {k: v for k, v in kwargs.items() if k in allowed_fields and v is not None}
+        for column in JSON_COLUMNS:
+            if column in updates and not isinstance(updates[column], str):
+                updates[column] = json.dumps(updates[column], ensure_ascii=False)
+        if isinstance(updates.get('palette'), list):
+            updates['palette'] = pack_palette(updates['palette'])
         
         if not updates:
             return False
@@ -159,7 +387,21 @@ class ClothingModel:
                 UPDATE clothing SET {set_clause}, updated_at = CURRENT_TIMESTAMP 
                 WHERE id = ?
             ''', values)
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+            row = None
+            if updated and updates.keys() & {'type', 'temp_min', 'temp_max'}:
+                cursor.execute('SELECT type, temp_min, temp_max FROM clothing WHERE id = ?', (clothing_id,))
+                row = cursor.fetchone()
+            generation = _generation(conn)
+        if row:
+            temperature_index.put(clothing_id, row['type'], row['temp_min'], row['temp_max'], generation)
+        else:
+            temperature_index.touch(generation)
+        if updated and 'phash' in updates:
+            duplicate_index.put(clothing_id, updates['phash'], generation)
+        else:
+            duplicate_index.touch(generation)
+        return updated
     
     @staticmethod
     def delete(clothing_id):
@@ -167,28 +409,267 @@ class ClothingModel:
         with db_session() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM clothing WHERE id = ?', (clothing_id,))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+            generation = _generation(conn)
+        temperature_index.remove(clothing_id, generation)
+        duplicate_index.remove(clothing_id, generation)
+        return deleted
     
     @staticmethod
-    def get_statistics():
-        """获取衣橱统计信息"""
+    def get_candidates(temperature, style=None):
+        """
+        获取推荐候选衣物：一次查询取回所有类型，只返回评分和展示需要的列
+        
+        Args:
+            temperature: 温度，候选为 temp_min <= 温度 <= temp_max 的衣物（走内存温度索引）
+            style: 风格，保留该风格及未设置风格的衣物
+            
+        Returns:
+            dict: {类型: [衣物, ...]}，每组按创建时间倒序
+        """
+        ids = temperature_index.ids(temperature)
+        if not ids:
+            return {}
+        sql = f'''
+            SELECT {', '.join(ClothingModel.CANDIDATE_COLUMNS)} FROM clothing
+            WHERE id IN (SELECT value FROM json_each(?))
+        '''
+        params = [json.dumps(list(ids))]
+        if style:
+            sql += " AND (style = ? OR style IS NULL OR style = '')"
+            params.append(style)
+        sql += ' ORDER BY type, created_at DESC'
+        
+        grouped = {}
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            for row in cursor.fetchall():
+                grouped.setdefault(row['type'], []).append(row_to_dict(row))
+        return grouped
+    
+    @staticmethod
+    def get_temperature_ranges():
+        """所有衣物的适宜温度 [(id, type, temp_min, temp_max), ...]"""
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, type, temp_min, temp_max FROM clothing')
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def get_phashes():
+        """获取所有已计算感知哈希的衣物 [(id, phash), ...]"""
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, phash FROM clothing WHERE phash IS NOT NULL')
+            return [(row['id'], row['phash']) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def get_stale_features(analyzer_version, after_id=0, limit=100):
+        """
+        按ID顺序获取特征缺失或分析版本过期的衣物
+        
+        Returns:
+            list: [{'id', 'image_path'}, ...]
+        """
         with db_session() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT type, COUNT(*) as count 
-                FROM clothing 
-                GROUP BY type
-            ''')
+                SELECT id, image_path FROM clothing
+                WHERE id > ? AND image_path IS NOT NULL
+                  AND (analyzer_version IS NULL OR analyzer_version != ?)
+                ORDER BY id LIMIT ?
+            ''', (after_id, analyzer_version, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    @query_cache.cached
+    def get_statistics():
+        """获取衣橱统计信息（读取触发器维护的汇总表）"""
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT type, count FROM wardrobe_type_counts WHERE count > 0')
             type_counts = {row['type']: row['count'] for row in cursor.fetchall()}
             
-            cursor.execute('SELECT COUNT(*) as total FROM clothing')
-            total = cursor.fetchone()['total']
-            
             return {
-                'total': total,
+                'total': sum(type_counts.values()),
                 'by_type': type_counts
             }
 
+# 全局温度索引和感知哈希索引，首次查询时从数据库加载
+temperature_index = TemperatureIndex(ClothingModel.get_temperature_ranges, generation=wardrobe_generation)
+duplicate_index = PhashIndex(ClothingModel.get_phashes, generation=wardrobe_generation)
+
+class WardrobeSummaryModel:
+    """
+    衣橱概况汇总数据
+    
+    wardrobe_type_counts 和 wardrobe_coverage 由 clothing 表上的触发器在同一事务中
+    增量更新（见迁移 5），读取时只需扫描类型数 × 温度档位数行，与衣橱大小无关。
+    """
+    
+    @staticmethod
+    def sync_levels(conn, ranges=TEMPERATURE_RANGES):
+        """
+        把配置中的温度档位写入 temperature_levels，档位有变化时重算温度覆盖
+        
+        Args:
+            conn: 数据库连接（不能处于事务中）
+            ranges: 温度档位配置
+            
+        Returns:
+            bool: 是否重算了温度覆盖
+        """
+        levels = {level: (r['min'] + r['max']) / 2 for level, r in ranges.items()}
+        # 与迁移一样先拿写锁，多个进程同时启动时只重算一次
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            stored = {row[0]: row[1] for row in conn.execute('SELECT level, temperature FROM temperature_levels')}
+            if stored == levels:
+                conn.rollback()
+                return False
+            conn.execute('DELETE FROM temperature_levels')
+            conn.executemany('INSERT INTO temperature_levels (level, temperature) VALUES (?, ?)',
+                             levels.items())
+            conn.execute('DELETE FROM wardrobe_coverage')
+            conn.execute('''
+                INSERT INTO wardrobe_coverage (level, type, count)
+                SELECT l.level, c.type, COUNT(*)
+                FROM clothing c JOIN temperature_levels l
+                    ON c.temp_min <= l.temperature AND c.temp_max >= l.temperature
+                GROUP BY l.level, c.type
+            ''')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return True
+    
+    @staticmethod
+    def get_coverage():
+        """
+        各温度档位下每种类型适合的衣物数
+        
+        Returns:
+            dict: {档位: {类型: 件数}}，不含数量为0的类型
+        """
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT level, type, count FROM wardrobe_coverage WHERE count > 0')
+            coverage = {}
+            for row in cursor.fetchall():
+                coverage.setdefault(row['level'], {})[row['type']] = row['count']
+            return coverage
+
+class BulkImportModel:
+    """批量导入数据模型"""
+    
+    @staticmethod
+    def imported_hashes():
+        """获取已导入图片的内容哈希"""
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT content_hash FROM bulk_import_log')
+            return {row['content_hash'] for row in cursor.fetchall()}
+    
+    @staticmethod
+    def import_batch(items):
+        """
+        在一个事务中插入一批衣物及其导入记录
+        
+        Args:
+            items: [{'name', 'type', 'color', 'style', 'temp_min', 'temp_max',
+                     'image_path', 'description', 'thumbnails', 'phash', 'palette', 'width',
+                     'height', 'analyzer_version', 'content_hash', 'source'}, ...]
+        
+        Returns:
+            list: 新衣物ID列表
+        """
+        ids = []
+        with db_session() as conn:
+            cursor = conn.cursor()
+            for item in items:
+                cursor.execute('''
+                    INSERT INTO clothing (name, type, color, style, temp_min, temp_max, image_path,
+                                          description, thumbnails, phash, palette, width, height,
+                                          content_hash, analyzer_version)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (item['name'], item['type'], item.get('color'), item.get('style'),
+                      item['temp_min'], item['temp_max'], item['image_path'], item.get('description'),
+                      json.dumps(item['thumbnails'], ensure_ascii=False) if item.get('thumbnails') else None,
+                      item.get('phash'), pack_palette(item['palette']) if item.get('palette') else None,
+                      item.get('width'), item.get('height'), item['content_hash'],
+                      item.get('analyzer_version')))
+                ids.append(cursor.lastrowid)
+            cursor.executemany('''
+                INSERT OR IGNORE INTO bulk_import_log (content_hash, source, clothing_id)
+                VALUES (?, ?, ?)
+            ''', [(item['content_hash'], item['source'], clothing_id)
+                  for item, clothing_id in zip(items, ids)])
+            generation = _generation(conn)
+        # 每插入一行版本号加一，逐件推进
+        first = generation - len(ids) + 1
+        for i, (item, clothing_id) in enumerate(zip(items, ids)):
+            temperature_index.put(clothing_id, item['type'], item['temp_min'], item['temp_max'], first + i)
+            duplicate_index.put(clothing_id, item.get('phash'), first + i)
+        return ids
+
+class RecommendationHistoryModel:
+    """推荐历史数据模型"""
+    
+    @staticmethod
+    def add_many(records):
+        """
+        在一个事务中写入一批推荐记录
+        
+        Args:
+            records: [(temperature, weather, city, outfit_ids), ...]，outfit_ids 为衣物ID列表的列表
+        """
+        with db_session() as conn:
+            conn.executemany('''
+                INSERT INTO recommendation_history (temperature, weather, city, outfit_ids)
+                VALUES (?, ?, ?, ?)
+            ''', [(temperature, weather, city, json.dumps(outfit_ids))
+                  for temperature, weather, city, outfit_ids in records])
+
+class AnalysisCacheModel:
+    """图片分析结果缓存（按内容哈希和分析版本，LRU淘汰）"""
+    
+    @staticmethod
+    def get(content_hash, analyzer_version):
+        """读取缓存结果，命中时刷新访问时间"""
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT result FROM image_analysis_cache
+                WHERE content_hash = ? AND analyzer_version = ?
+            ''', (content_hash, analyzer_version))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cursor.execute('''
+                UPDATE image_analysis_cache SET accessed_at = ?
+                WHERE content_hash = ? AND analyzer_version = ?
+            ''', (time.time(), content_hash, analyzer_version))
+            return json.loads(row['result'])
+    
+    @staticmethod
+    def put(content_hash, analyzer_version, result, max_entries):
+        """写入缓存，超出容量时淘汰最久未访问的条目"""
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO image_analysis_cache
+                (content_hash, analyzer_version, result, accessed_at)
+                VALUES (?, ?, ?, ?)
+            ''', (content_hash, analyzer_version, json.dumps(result, ensure_ascii=False), time.time()))
+            cursor.execute('''
+                DELETE FROM image_analysis_cache WHERE rowid IN (
+                    SELECT rowid FROM image_analysis_cache
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+
 # 初始化数据库
 if __name__ == '__main__':
     init_database()
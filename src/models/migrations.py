@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库结构迁移
+
+版本号记录在 PRAGMA user_version 中，init_database() 启动时按顺序执行尚未
+应用的迁移。每个迁移在独立的事务中执行并同时更新版本号，失败时整体回滚。
+新增表、列或索引时在 MIGRATIONS 末尾追加一项，不要修改已发布的迁移。
+"""
+
+
+def _ensure_columns(cursor, table, columns):
+    """为已存在的表补充缺失的列"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, declaration in columns:
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {declaration}')
+
+
+def _create_base_tables(cursor):
+    """衣物、穿搭组合、推荐历史表"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS clothing (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            color TEXT,
+            style TEXT,
+            temp_min INTEGER DEFAULT 0,
+            temp_max INTEGER DEFAULT 40,
+            image_path TEXT,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS outfits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            top_id INTEGER,
+            bottom_id INTEGER,
+            outerwear_id INTEGER,
+            shoes_id INTEGER,
+            accessories_id INTEGER,
+            temp_min INTEGER,
+            temp_max INTEGER,
+            style TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (top_id) REFERENCES clothing(id),
+            FOREIGN KEY (bottom_id) REFERENCES clothing(id),
+            FOREIGN KEY (outerwear_id) REFERENCES clothing(id),
+            FOREIGN KEY (shoes_id) REFERENCES clothing(id),
+            FOREIGN KEY (accessories_id) REFERENCES clothing(id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS recommendation_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            temperature REAL,
+            weather TEXT,
+            city TEXT,
+            outfit_ids TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _add_image_features(cursor):
+    """缩略图、感知哈希、图片特征列，分析缓存表和批量导入记录表"""
+    # 早期版本按需补列，这里逐列检查，已存在的列跳过
+    _ensure_columns(cursor, 'clothing', [
+        ('thumbnails', 'TEXT'),
+        ('phash', 'TEXT'),
+        ('palette', 'BLOB'),
+        ('width', 'INTEGER'),
+        ('height', 'INTEGER'),
+        ('content_hash', 'TEXT'),
+        ('analyzer_version', 'TEXT'),
+    ])
+
+    # 图片分析结果缓存表（按内容哈希）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_analysis_cache (
+            content_hash TEXT PRIMARY KEY,
+            analyzer_version TEXT NOT NULL,
+            result TEXT NOT NULL,
+            accessed_at REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_cache_accessed
+        ON image_analysis_cache (accessed_at)
+    ''')
+
+    # 批量导入记录表（用于断点续传）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bulk_import_log (
+            content_hash TEXT PRIMARY KEY,
+            source TEXT,
+            clothing_id INTEGER,
+            imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (clothing_id) REFERENCES clothing(id)
+        )
+    ''')
+
+
+def _add_clothing_indexes(cursor):
+    """衣物列表和按温度筛选的索引"""
+    # 按类型筛选 + 按时间倒序：get_all(type)、get_by_temperature(type)
+    # 温度列放在索引里，范围条件在索引上过滤，只回表读取命中的行
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_clothing_type_created
+        ON clothing (type, created_at DESC, temp_min, temp_max)
+    ''')
+    # 不按类型筛选的衣物列表：get_all()
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_clothing_created
+        ON clothing (created_at)
+    ''')
+
+
+def _add_clothing_page_index(cursor):
+    """衣物列表 keyset 分页的索引"""
+    # 在 idx_clothing_type_created 的基础上加入 id 作为排序的第二列，
+    # 按类型分页的 (created_at, id) 游标条件直接在索引上定位；原索引的查询
+    # 都能用新索引，因此删除原索引。不按类型分页使用 idx_clothing_created
+    # （索引末尾隐含 rowid）
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_clothing_type_page
+        ON clothing (type, created_at DESC, id DESC, temp_min, temp_max)
+    ''')
+    cursor.execute('DROP INDEX IF EXISTS idx_clothing_type_created')
+
+
+def _add_wardrobe_summary(cursor):
+    """衣橱概况汇总表，由触发器随 clothing 的增删改同步更新"""
+    # 每种类型的衣物数
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS wardrobe_type_counts (
+            type TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    # 温度档位及其代表温度（区间中点），由 init_database() 按配置同步
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS temperature_levels (
+            level TEXT PRIMARY KEY,
+            temperature REAL NOT NULL
+        )
+    ''')
+    # 每个温度档位下每种类型适合的衣物数
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS wardrobe_coverage (
+            level TEXT NOT NULL,
+            type TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (level, type)
+        )
+    ''')
+
+    # 触发器中的增减语句，NEW/OLD 替换为对应的行
+    add = '''
+        INSERT INTO wardrobe_type_counts (type, count) VALUES (NEW.type, 1)
+        ON CONFLICT (type) DO UPDATE SET count = count + 1;
+        INSERT INTO wardrobe_coverage (level, type, count)
+        SELECT level, NEW.type, 1 FROM temperature_levels
+        WHERE NEW.temp_min <= temperature AND NEW.temp_max >= temperature
+        ON CONFLICT (level, type) DO UPDATE SET count = count + 1;
+    '''
+    remove = '''
+        UPDATE wardrobe_type_counts SET count = count - 1 WHERE type = OLD.type;
+        UPDATE wardrobe_coverage SET count = count - 1
+        WHERE type = OLD.type AND level IN (
+            SELECT level FROM temperature_levels
+            WHERE OLD.temp_min <= temperature AND OLD.temp_max >= temperature
+        );
+    '''
+    # executescript() 会提交当前事务，这里逐条执行
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clothing_summary_insert AFTER INSERT ON clothing
+        BEGIN {add} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clothing_summary_delete AFTER DELETE ON clothing
+        BEGIN {remove} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS clothing_summary_update
+        AFTER UPDATE OF type, temp_min, temp_max ON clothing
+        BEGIN {remove} {add} END
+    ''')
+
+    # 已有衣物的类型计数；温度覆盖在写入温度档位时统一重算
+    cursor.execute('''
+        INSERT OR REPLACE INTO wardrobe_type_counts (type, count)
+        SELECT type, COUNT(*) FROM clothing GROUP BY type
+    ''')
+
+
+def _add_wardrobe_generation(cursor):
+    """衣橱版本号：clothing 表每次写入加一，各进程据此判断缓存是否过期"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS wardrobe_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO wardrobe_generation (id, generation) VALUES (1, 0)')
+    # 每一行的增删改都加一，批量写入时版本号按行数增加
+    for event in ('INSERT', 'DELETE', 'UPDATE'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS clothing_generation_{event.lower()} AFTER {event} ON clothing
+            BEGIN
+                UPDATE wardrobe_generation SET generation = generation + 1 WHERE id = 1;
+            END
+        ''')
+
+
+def _key_analysis_cache_by_version(cursor):
+    """分析缓存改为按 (内容哈希, 分析版本) 存储，同一图片的不同版本互不覆盖"""
+    cursor.execute('''
+        CREATE TABLE image_analysis_cache_new (
+            content_hash TEXT NOT NULL,
+            analyzer_version TEXT NOT NULL,
+            result TEXT NOT NULL,
+            accessed_at REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (content_hash, analyzer_version)
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO image_analysis_cache_new
+            (content_hash, analyzer_version, result, accessed_at, created_at)
+        SELECT content_hash, analyzer_version, result, accessed_at, created_at
+        FROM image_analysis_cache
+    ''')
+    cursor.execute('DROP TABLE image_analysis_cache')
+    cursor.execute('ALTER TABLE image_analysis_cache_new RENAME TO image_analysis_cache')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_cache_accessed
+        ON image_analysis_cache (accessed_at)
+    ''')
+
+
+def _clean_import_log_on_delete(cursor):
+    """删除衣物时同时删除其导入记录，重新导入同一图片时不再被当作已导入跳过"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bulk_import_log_clothing
+        ON bulk_import_log (clothing_id)
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS clothing_import_log_delete AFTER DELETE ON clothing
+        BEGIN
+            DELETE FROM bulk_import_log WHERE clothing_id = OLD.id;
+        END
+    ''')
+    # 清理已删除衣物遗留的导入记录
+    cursor.execute('''
+        DELETE FROM bulk_import_log
+        WHERE clothing_id IS NULL OR clothing_id NOT IN (SELECT id FROM clothing)
+    ''')
+
+
+# (版本号, 说明, 迁移函数)，版本号从 1 开始连续递增
+MIGRATIONS = [
+    (1, '基础表', _create_base_tables),
+    (2, '图片特征列、分析缓存表、批量导入记录表', _add_image_features),
+    (3, '衣物查询索引', _add_clothing_indexes),
+    (4, '衣物分页索引', _add_clothing_page_index),
+    (5, '衣橱概况汇总表', _add_wardrobe_summary),
+    (6, '衣橱版本号', _add_wardrobe_generation),
+    (7, '分析缓存按分析版本区分', _key_analysis_cache_by_version),
+    (8, '删除衣物时清理导入记录', _clean_import_log_on_delete),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, target=LATEST_VERSION):
+    """
+    将数据库升级到目标版本
+
+    Args:
+        conn: 数据库连接（不能处于事务中）
+        target: 目标版本，默认升级到最新
+
+    Returns:
+        list: 本次应用的迁移版本号
+    """
+    applied = []
+    for version, description, func in MIGRATIONS:
+        if version > target:
+            break
+        # BEGIN IMMEDIATE 先拿到写锁，多个进程同时启动时只有一个执行迁移
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if current_version(conn) >= version:
+                conn.rollback()
+                continue
+            func(conn.cursor())
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+        print(f"数据库迁移 {version}: {description}")
+    return applied
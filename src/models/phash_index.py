@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+衣物感知哈希的内存索引
+
+BK-tree 按汉明距离检索近似重复，无需与每张图片逐一比较。ClothingModel 写入时
+按ID就地增删树中的哈希，首次查询时从数据库加载，版本号的处理见 VersionedIndex。
+"""
+from config import DUPLICATE_MAX_DISTANCE
+from models.versioned_index import VersionedIndex
+
+
+def hamming(a, b):
+    """两个十六进制哈希之间的汉明距离"""
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def _distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """按汉明距离组织的 BK-tree，键为十六进制哈希"""
+
+    def __init__(self):
+        # 节点: [哈希整数, 值列表, {距离: 子节点}]，建树时转换一次，检索时不再逐个解析
+        self._root = None
+        self.size = 0
+        # 值列表已清空、只用于路由的节点数
+        self.empty_nodes = 0
+
+    def add(self, key, value):
+        key = int(key, 16)
+        self.size += 1
+        if self._root is None:
+            self._root = [key, [value], {}]
+            return
+        node = self._root
+        while True:
+            distance = _distance(key, node[0])
+            if distance == 0:
+                if not node[1]:
+                    self.empty_nodes -= 1
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [value], {}]
+                return
+            node = child
+
+    def remove(self, key, value):
+        """
+        删除一个值。节点保留在树中继续参与路由，值列表为空的节点计入 empty_nodes
+
+        Returns:
+            bool: 找到并删除时返回 True
+        """
+        key = int(key, 16)
+        node = self._root
+        while node is not None:
+            distance = _distance(key, node[0])
+            if distance == 0:
+                if value not in node[1]:
+                    return False
+                node[1].remove(value)
+                self.size -= 1
+                if not node[1]:
+                    self.empty_nodes += 1
+                return True
+            node = node[2].get(distance)
+        return False
+
+    def search(self, key, max_distance):
+        """返回 [(值, 距离), ...]，按距离升序"""
+        key = int(key, 16)
+        results = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            distance = _distance(key, node[0])
+            if distance <= max_distance:
+                results.extend((value, distance) for value in node[1])
+            # 三角不等式剪枝：只有 |d - distance| <= max_distance 的子树可能命中
+            for d, child in node[2].items():
+                if distance - max_distance <= d <= distance + max_distance:
+                    stack.append(child)
+        results.sort(key=lambda r: r[1])
+        return results
+
+
+class PhashIndex(VersionedIndex):
+    """衣物ID -> 感知哈希，以及按哈希检索的 BK-tree"""
+
+    def __init__(self, loader, generation=None):
+        """
+        Args:
+            loader: 返回 [(id, phash), ...] 的函数
+            generation: 返回当前衣橱版本号的函数（可选）
+        """
+        super().__init__(loader, generation)
+        self._hashes = {}  # id -> phash
+        self._tree = BKTree()
+
+    def _reset(self):
+        self._hashes = {}
+        self._tree = BKTree()
+
+    def _insert(self, clothing_id, phash):
+        self._hashes[clothing_id] = phash
+        self._tree.add(phash, clothing_id)
+
+    def _discard(self, clothing_id):
+        phash = self._hashes.pop(clothing_id, None)
+        if phash is None:
+            return
+        self._tree.remove(phash, clothing_id)
+        # 空节点多于有效值时重建，避免删除较多后检索变慢
+        if self._tree.empty_nodes > self._tree.size:
+            self._tree = BKTree()
+            for other, other_phash in self._hashes.items():
+                self._tree.add(other_phash, other)
+
+    def put(self, clothing_id, phash, generation=None):
+        """新增或更新一件衣物的哈希（phash 为空表示没有哈希），generation 为这次写入后的衣橱版本号"""
+        def change():
+            if self._hashes.get(clothing_id) == phash:
+                return
+            self._discard(clothing_id)
+            if phash:
+                self._insert(clothing_id, phash)
+        self._patch(generation, change)
+
+    def remove(self, clothing_id, generation=None):
+        """删除一件衣物，generation 为这次写入后的衣橱版本号"""
+        self._patch(generation, lambda: self._discard(clothing_id))
+
+    def find(self, phash, max_distance=DUPLICATE_MAX_DISTANCE, exclude=None):
+        """查找近似重复的衣物，返回 [{'id', 'distance'}, ...]，按距离升序"""
+        matches = self._query(lambda: self._tree.search(phash, max_distance))
+        return [{'id': clothing_id, 'distance': distance} for clothing_id, distance in matches
+                if clothing_id != exclude]
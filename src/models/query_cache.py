@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+衣物查询结果缓存
+
+缓存键为 (查询名, 参数)，整个缓存绑定一个衣橱版本号。版本号保存在数据库中，
+clothing 表的每次写入都由触发器加一（见迁移 6），因此任何进程的写入都会让
+其他进程在下一次读取时发现版本变化并清空缓存。每次读取只需查询一行版本号，
+命中时不再读取衣物表。缓存按最近最少使用淘汰，条目数有上限。
+
+缓存的结果在多次调用间共享，调用方不要修改返回的对象。
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    """按版本号失效的 LRU 查询缓存"""
+
+    def __init__(self, generation, max_entries):
+        """
+        Args:
+            generation: 返回当前衣橱版本号的函数
+            max_entries: 最多缓存的查询结果数，为0时不缓存
+        """
+        self.generation = generation
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = None
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, key, loader):
+        """读取缓存，未命中时调用 loader() 加载"""
+        if self.max_entries <= 0:
+            with self._lock:
+                self._stats['misses'] += 1
+            return loader()
+
+        # 先读版本号再加载：加载期间有写入时，结果会记在旧版本下，下次读取即失效
+        generation = self.generation()
+        with self._lock:
+            if generation != self._generation:
+                if self._entries:
+                    self._stats['invalidations'] += 1
+                self._entries.clear()
+                self._generation = generation
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._entries[key]
+            self._stats['misses'] += 1
+
+        value = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+        return value
+
+    def cached(self, func):
+        """装饰器：以函数名和参数为键缓存查询结果"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            return self.get(key, lambda: func(*args, **kwargs))
+        return wrapper
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['generation'] = self._generation
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+衣物适宜温度的内存索引
+
+按类型保存两份有序数组：按 temp_min 升序和按 temp_max 升序。查询温度 t 时
+二分查找 temp_min <= t 与 temp_max >= t 两段的长度，只遍历较短的一段并检查
+另一端，占用内存与衣物数量成正比。ClothingModel 写入时同步修补索引，首次
+查询时从数据库加载，版本号的处理见 VersionedIndex。
+"""
+import math
+from bisect import bisect_left, bisect_right
+
+from models.versioned_index import VersionedIndex
+
+
+class _SortedColumn:
+    """按温度升序排列的平行数组：排序温度、区间另一端的温度、衣物ID"""
+
+    __slots__ = ('temps', 'others', 'ids')
+
+    def __init__(self, items=()):
+        """items: [(排序温度, 另一端温度, 衣物ID), ...]，无需有序"""
+        items = sorted(items, key=lambda item: item[0])
+        self.temps = [item[0] for item in items]
+        self.others = [item[1] for item in items]
+        self.ids = [item[2] for item in items]
+
+    def add(self, temp, other, clothing_id):
+        i = bisect_right(self.temps, temp)
+        self.temps.insert(i, temp)
+        self.others.insert(i, other)
+        self.ids.insert(i, clothing_id)
+
+    def remove(self, temp, clothing_id):
+        i = self.ids.index(clothing_id, bisect_left(self.temps, temp), bisect_right(self.temps, temp))
+        del self.temps[i]
+        del self.others[i]
+        del self.ids[i]
+
+
+class TemperatureIndex(VersionedIndex):
+    """按类型、按温度排序的区间索引"""
+
+    def __init__(self, loader, generation=None):
+        """
+        Args:
+            loader: 返回 [(id, type, temp_min, temp_max), ...] 的函数
+            generation: 返回当前衣橱版本号的函数（可选）
+        """
+        super().__init__(loader, generation)
+        self._entries = {}  # id -> (type, temp_min, temp_max)
+        self._columns = {}  # type -> (按 temp_min 排序, 按 temp_max 排序)
+
+    def _reset(self):
+        self._entries = {}
+        self._columns = {}
+
+    def _build(self, rows):
+        # 整体加载时先收集再各排序一次，避免逐行插入有序数组
+        pending = {}
+        for clothing_id, clothing_type, temp_min, temp_max in rows:
+            temp_min = -math.inf if temp_min is None else temp_min
+            temp_max = math.inf if temp_max is None else temp_max
+            self._entries[clothing_id] = (clothing_type, temp_min, temp_max)
+            pending.setdefault(clothing_type, []).append((temp_min, temp_max, clothing_id))
+        for clothing_type, items in pending.items():
+            self._columns[clothing_type] = (
+                _SortedColumn(items),
+                _SortedColumn((temp_max, temp_min, clothing_id) for temp_min, temp_max, clothing_id in items),
+            )
+
+    def _insert(self, clothing_id, clothing_type, temp_min, temp_max):
+        temp_min = -math.inf if temp_min is None else temp_min
+        temp_max = math.inf if temp_max is None else temp_max
+        self._entries[clothing_id] = (clothing_type, temp_min, temp_max)
+        columns = self._columns.get(clothing_type)
+        if columns is None:
+            columns = self._columns[clothing_type] = (_SortedColumn(), _SortedColumn())
+        columns[0].add(temp_min, temp_max, clothing_id)
+        columns[1].add(temp_max, temp_min, clothing_id)
+
+    def _discard(self, clothing_id):
+        entry = self._entries.pop(clothing_id, None)
+        if entry is None:
+            return
+        clothing_type, temp_min, temp_max = entry
+        by_min, by_max = self._columns[clothing_type]
+        by_min.remove(temp_min, clothing_id)
+        by_max.remove(temp_max, clothing_id)
+
+    def put(self, clothing_id, clothing_type, temp_min, temp_max, generation=None):
+        """新增或更新一件衣物，generation 为这次写入后的衣橱版本号"""
+        def change():
+            self._discard(clothing_id)
+            self._insert(clothing_id, clothing_type, temp_min, temp_max)
+        self._patch(generation, change)
+
+    def remove(self, clothing_id, generation=None):
+        """删除一件衣物，generation 为这次写入后的衣橱版本号"""
+        self._patch(generation, lambda: self._discard(clothing_id))
+
+    def ids(self, temperature, clothing_type=None):
+        """
+        适合指定温度的衣物ID（temp_min <= 温度 <= temp_max）
+
+        Returns:
+            set: 衣物ID集合
+        """
+        def lookup():
+            types = [clothing_type] if clothing_type else list(self._columns)
+            result = set()
+            for t in types:
+                columns = self._columns.get(t)
+                if not columns:
+                    continue
+                by_min, by_max = columns
+                # temp_min <= 温度 的前缀与 temp_max >= 温度 的后缀，结果是两段的交集
+                low_end = bisect_right(by_min.temps, temperature)
+                high_start = bisect_left(by_max.temps, temperature)
+                if low_end <= len(by_max.ids) - high_start:
+                    result.update(clothing_id for temp_max, clothing_id
+                                  in zip(by_min.others[:low_end], by_min.ids[:low_end])
+                                  if temp_max >= temperature)
+                else:
+                    result.update(clothing_id for temp_min, clothing_id
+                                  in zip(by_max.others[high_start:], by_max.ids[high_start:])
+                                  if temp_min <= temperature)
+            return result
+
+        return self._query(lookup)
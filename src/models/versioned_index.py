@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按衣橱版本号同步的内存索引基类
+
+索引首次查询时从数据库加载，并记录加载时的衣橱版本号（见迁移 6）。本进程的
+写入带上写入后的版本号就地修补索引并推进版本；查询时发现版本号与数据库不一致
+（其他进程写入过）则丢弃索引重新加载。
+"""
+import threading
+
+
+class VersionedIndex:
+    """子类实现 _reset() / _insert() / _discard()（可选 _build()），并通过 _patch() / _query() 读写"""
+
+    def __init__(self, loader, generation=None):
+        """
+        Args:
+            loader: 返回全部索引行的函数，加载时交给 _build(rows)
+            generation: 返回当前衣橱版本号的函数（可选）
+        """
+        self.loader = loader
+        self.generation = generation
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._generation = None  # 索引对应的衣橱版本号
+        self._writes = 0
+
+    def _reset(self):
+        """清空索引结构（调用方持有锁）"""
+        raise NotImplementedError
+
+    def _insert(self, key, *values):
+        raise NotImplementedError
+
+    def _discard(self, key):
+        raise NotImplementedError
+
+    def _build(self, rows):
+        """从数据库加载的全部行建立索引（调用方持有锁，索引已清空）"""
+        for row in rows:
+            self._insert(*row)
+
+    def _load(self):
+        if self._loaded:
+            return
+        while True:
+            with self._lock:
+                writes = self._writes
+            # 先读版本号再加载，加载期间其他进程的写入会在下次查询时触发重新加载
+            generation = self.generation() if self.generation else None
+            rows = self.loader()
+            with self._lock:
+                if self._loaded:
+                    return
+                # 加载期间有写入时重新加载，避免漏掉这次写入
+                if self._writes != writes:
+                    continue
+                self._reset()
+                self._build(rows)
+                self._loaded = True
+                self._generation = generation
+                return
+
+    def _advance(self, generation):
+        """
+        本进程写入后推进版本号（调用方持有锁）
+
+        Returns:
+            bool: 索引仍然有效时返回 True；版本号不连续时丢弃索引并返回 False
+        """
+        if not self._loaded:
+            return False
+        if generation is None or self._generation is None:
+            return True
+        if generation == self._generation + 1:
+            self._generation = generation
+            return True
+        # 版本号未变化说明这次写入没有改动任何行
+        if generation == self._generation:
+            return True
+        self._drop()
+        return False
+
+    def _drop(self):
+        self._loaded = False
+        self._generation = None
+        self._reset()
+
+    def _patch(self, generation, change=None):
+        """
+        记录本进程的一次写入并修补索引
+
+        Args:
+            generation: 这次写入后的衣橱版本号
+            change: 索引仍然有效时调用的修补函数（持有锁）
+        """
+        with self._lock:
+            self._writes += 1
+            if self._advance(generation) and change:
+                change()
+
+    def touch(self, generation):
+        """记录一次不影响索引的写入（例如只修改了名称）"""
+        self._patch(generation)
+
+    def invalidate(self):
+        """丢弃索引，下次查询时重新加载"""
+        with self._lock:
+            self._writes += 1
+            self._drop()
+
+    def _check_generation(self):
+        """版本号与数据库不一致时（其他进程写入过）丢弃索引"""
+        if not self.generation:
+            return
+        generation = self.generation()
+        with self._lock:
+            if self._loaded and generation != self._generation:
+                self._writes += 1
+                self._drop()
+
+    def _query(self, func):
+        """确保索引已加载且版本最新，在锁内执行 func() 并返回结果"""
+        self._check_generation()
+        while True:
+            self._load()
+            with self._lock:
+                # 加载后被 invalidate() 清空时重新加载
+                if not self._loaded:
+                    continue
+                return func()
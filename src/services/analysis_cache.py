@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+带持久化缓存的图片分析服务
+
+上传内容边读取边计算 SHA-256，相同内容的图片直接返回缓存的分析结果。
+"""
+import io
+import hashlib
+
+from config import ANALYSIS_CACHE_MAX_ENTRIES, IMAGE_ANALYSIS_FAST_MODE, PALETTE_ENGINE
+from models.database import AnalysisCacheModel
+from services.image_analyzer import ImageAnalyzer
+from services.dedup import dhash
+
+CHUNK_SIZE = 64 * 1024
+
+
+def hash_stream(stream, chunk_size=CHUNK_SIZE):
+    """
+    流式读取并计算内容哈希
+    
+    Returns:
+        tuple: (十六进制哈希, 含完整内容的 BytesIO)
+    """
+    digest = hashlib.sha256()
+    buffer = io.BytesIO()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        buffer.write(chunk)
+    buffer.seek(0)
+    return digest.hexdigest(), buffer
+
+
+def analysis_version(fast=IMAGE_ANALYSIS_FAST_MODE):
+    """缓存使用的版本号，不同解码模式、主色调引擎的结果分开缓存"""
+    return f"{ImageAnalyzer.ANALYZER_VERSION}-{PALETTE_ENGINE}{'-fast' if fast else ''}"
+
+
+def analyze_upload(stream, fast=IMAGE_ANALYSIS_FAST_MODE):
+    """
+    分析上传的图片（含感知哈希），优先使用缓存
+    
+    Returns:
+        tuple: (内容哈希, 分析结果, 是否命中缓存)
+    """
+    content_hash, buffer = hash_stream(stream)
+    version = analysis_version(fast)
+    
+    cached = AnalysisCacheModel.get(content_hash, version)
+    if cached is not None and 'phash' in cached:
+        return content_hash, cached, True
+    
+    result = cached or ImageAnalyzer.analyze(buffer, fast=fast)
+    # 分析失败的结果不缓存
+    if 'error' not in result:
+        result['phash'] = dhash(buffer)
+        AnalysisCacheModel.put(content_hash, version, result, ANALYSIS_CACHE_MAX_ENTRIES)
+    return content_hash, result, False
+
+
+def feature_columns(content_hash, analysis, fast=IMAGE_ANALYSIS_FAST_MODE):
+    """
+    分析结果中持久化到 clothing 表的特征列
+    
+    Returns:
+        dict: 可直接传给 ClothingModel.update；分析失败时只包含内容哈希
+    """
+    if 'error' in analysis:
+        return {'content_hash': content_hash}
+    return {
+        'palette': analysis.get('palette'),
+        'width': analysis.get('width'),
+        'height': analysis.get('height'),
+        'phash': analysis.get('phash'),
+        'content_hash': content_hash,
+        'analyzer_version': analysis_version(fast),
+    }
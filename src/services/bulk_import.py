@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+衣橱批量导入工具
+
+从目录或 zip 包导入衣物图片，可选 CSV / JSON 清单提供名称、类型等字段。
+缺失的类型、颜色和温度由多进程图片分析补全，图片特征和缩略图随衣物一并写入，数据库按批次事务写入。
+已导入的图片按内容哈希记录在 bulk_import_log 中，中断后重新运行即可续传。
+
+用法（在 src 目录下）:
+    python -m services.bulk_import photos/ --manifest manifest.csv
+    python -m services.bulk_import photos.zip --workers 8
+
+CSV 清单表头: file,name,type,color,style,temp_min,temp_max,description
+JSON 清单: 同名字段的对象列表，或以文件名为键的对象
+"""
+import io
+import os
+import csv
+import sys
+import json
+import time
+import hashlib
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.utils import secure_filename
+
+from config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, CLOTHING_TYPES, BULK_IMPORT_BATCH_SIZE
+from models.database import init_database, BulkImportModel
+from services.image_analyzer import ImageAnalyzer
+from services.analysis_cache import feature_columns
+from services.dedup import dhash
+from services.thumbnails import generate_thumbnails, delete_thumbnails
+
+MANIFEST_FIELDS = ['name', 'type', 'color', 'style', 'temp_min', 'temp_max', 'description']
+
+
+class ImageSource:
+    """图片来源：目录或 zip 包"""
+
+    def __init__(self, path):
+        self.path = path
+        self.is_zip = zipfile.is_zipfile(path) if os.path.isfile(path) else False
+        self._zip = zipfile.ZipFile(path) if self.is_zip else None
+
+    def list(self):
+        """列出所有支持格式的图片（相对路径，已排序）"""
+        if self.is_zip:
+            names = [n for n in self._zip.namelist() if not n.endswith('/')]
+        else:
+            names = []
+            for root, _dirs, files in os.walk(self.path):
+                for filename in files:
+                    names.append(os.path.relpath(os.path.join(root, filename), self.path))
+        return sorted(n for n in names if _allowed(n))
+
+    def read(self, name):
+        if self.is_zip:
+            return self._zip.read(name)
+        with open(os.path.join(self.path, name), 'rb') as f:
+            return f.read()
+
+
+def _allowed(name):
+    return '.' in name and name.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def load_manifest(path):
+    """
+    读取清单
+
+    Returns:
+        tuple: ({文件相对路径或文件名: 字段字典}, [无效行的错误信息])
+    """
+    if not path:
+        return {}, []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        if path.lower().endswith('.json'):
+            data = json.load(f)
+            rows = data if isinstance(data, list) else [dict(v, file=k) for k, v in data.items()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    manifest = {}
+    errors = []
+    for i, row in enumerate(rows, 1):
+        if not isinstance(row, dict) or not row.get('file'):
+            errors.append(f"清单第 {i} 行缺少 file 字段，已忽略")
+            continue
+        fields = {k: row[k] for k in MANIFEST_FIELDS if row.get(k) not in (None, '')}
+        manifest[row['file']] = fields
+    return manifest, errors
+
+
+# ==================== 子进程 ====================
+
+_worker_source = None
+_worker_imported = frozenset()
+
+
+def _init_worker(source_path, imported):
+    global _worker_source, _worker_imported
+    _worker_source = ImageSource(source_path)
+    _worker_imported = imported
+
+
+def _prepare(task):
+    """读取图片、补全字段并复制到上传目录（在子进程中执行）"""
+    name, fields = task
+    try:
+        data = _worker_source.read(name)
+        content_hash = hashlib.sha256(data).hexdigest()
+        if content_hash in _worker_imported:
+            return {'status': 'skipped', 'source': name, 'content_hash': content_hash}
+
+        item = dict(fields)
+        item.setdefault('name', os.path.splitext(os.path.basename(name))[0])
+        if item.get('type') not in CLOTHING_TYPES:
+            item.pop('type', None)
+
+        # 清单已给出类型和颜色时也要分析，以便写入图片特征
+        result = ImageAnalyzer.analyze(io.BytesIO(data))
+        if 'error' in result:
+            raise ValueError(result['error'])
+        result['phash'] = dhash(data)
+        item.setdefault('type', result['suggested_type'])
+        item.setdefault('color', result['suggested_color'])
+        if 'temp_min' not in item and 'temp_max' not in item:
+            item['temp_min'] = result['suggested_temp']['min']
+            item['temp_max'] = result['suggested_temp']['max']
+
+        default_temp = ImageAnalyzer.TYPE_TEMP_RANGES.get(item['type'], {'min': 0, 'max': 40})
+        item['temp_min'] = int(item.get('temp_min', default_temp['min']))
+        item['temp_max'] = int(item.get('temp_max', default_temp['max']))
+
+        # 以内容哈希命名，重复运行时覆盖同一文件而不会产生孤儿文件
+        filename = f"{content_hash[:16]}_{secure_filename(os.path.basename(name))}"
+        type_folder = os.path.join(UPLOAD_FOLDER, item['type'])
+        os.makedirs(type_folder, exist_ok=True)
+        with open(os.path.join(type_folder, filename), 'wb') as f:
+            f.write(data)
+        image_path = f"uploads/{item['type']}/{filename}"
+
+        # 缩略图生成失败不影响导入，之后可用 python -m services.thumbnails 补生成
+        try:
+            thumbnails = generate_thumbnails(image_path, data=data)
+        except Exception:
+            thumbnails = None
+
+        item.update(feature_columns(content_hash, result))
+        item.update({
+            'status': 'ok',
+            'source': name,
+            'image_path': image_path,
+            'thumbnails': thumbnails,
+        })
+        return item
+    except Exception as e:
+        return {'status': 'failed', 'source': name, 'error': str(e)}
+
+
+# ==================== 主流程 ====================
+
+def _remove_upload(image_path):
+    """删除复制到上传目录的图片（image_path 形如 uploads/<类型>/<文件名>）"""
+    try:
+        os.remove(os.path.join(UPLOAD_FOLDER, os.path.relpath(image_path, 'uploads')))
+    except OSError:
+        pass
+
+
+def run_import(source_path, manifest_path=None, workers=None, batch_size=BULK_IMPORT_BATCH_SIZE):
+    """
+    执行批量导入
+
+    Returns:
+        dict: {'total', 'imported', 'skipped', 'failed', 'manifest_errors', 'seconds'}
+    """
+    init_database()
+    source = ImageSource(source_path)
+    manifest, manifest_errors = load_manifest(manifest_path)
+    for error in manifest_errors:
+        print(error, file=sys.stderr)
+    names = source.list()
+    tasks = [(n, manifest.get(n, manifest.get(os.path.basename(n), {}))) for n in names]
+    imported = frozenset(BulkImportModel.imported_hashes())
+
+    stats = {'total': len(tasks), 'imported': 0, 'skipped': 0, 'failed': 0,
+             'manifest_errors': len(manifest_errors)}
+    seen = {}  # 内容哈希 -> 本次导入保留的图片路径
+    batch = []
+    start = time.perf_counter()
+
+    def flush():
+        if batch:
+            BulkImportModel.import_batch(batch)
+            stats['imported'] += len(batch)
+            batch.clear()
+
+    def report(done):
+        elapsed = time.perf_counter() - start
+        rate = stats['imported'] / elapsed if elapsed else 0.0
+        print(f"\r已处理 {done}/{stats['total']}  导入 {stats['imported']}  跳过 {stats['skipped']}  "
+              f"失败 {stats['failed']}  {rate:.1f} 件/秒", end='', flush=True)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(source_path, imported)) as pool:
+        for done, item in enumerate(pool.map(_prepare, tasks, chunksize=4), 1):
+            status = item.pop('status')
+            if status == 'failed':
+                stats['failed'] += 1
+                print(f"\n导入失败 {item['source']}: {item['error']}", file=sys.stderr)
+            elif status == 'skipped':
+                stats['skipped'] += 1
+            elif item['content_hash'] in seen:
+                # 与本次导入中较早的图片内容相同：删除子进程已复制的文件
+                # （文件名相同时就是保留的那张，不能删除）
+                stats['skipped'] += 1
+                if item['image_path'] != seen[item['content_hash']]:
+                    _remove_upload(item['image_path'])
+                    delete_thumbnails(item.get('thumbnails'))
+            else:
+                seen[item['content_hash']] = item['image_path']
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    flush()
+            if done % 10 == 0:
+                report(done)
+        flush()
+
+    stats['seconds'] = round(time.perf_counter() - start, 2)
+    report(stats['total'])
+    print()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量导入衣物图片')
+    parser.add_argument('source', help='图片目录或 zip 包')
+    parser.add_argument('--manifest', help='CSV / JSON 清单文件')
+    parser.add_argument('--workers', type=int, default=None, help='分析进程数，默认为 CPU 核数')
+    parser.add_argument('--batch-size', type=int, default=BULK_IMPORT_BATCH_SIZE, help='每个事务插入的条数')
+    args = parser.parse_args(argv)
+
+    try:
+        stats = run_import(args.source, args.manifest, args.workers, args.batch_size)
+    except KeyboardInterrupt:
+        print("\n导入已中断，已提交的批次不会重复导入，重新运行即可继续")
+        return 1
+
+    rate = stats['imported'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"✅ 导入完成: 共 {stats['total']}，导入 {stats['imported']}，跳过 {stats['skipped']}，"
+          f"失败 {stats['failed']}，清单无效行 {stats['manifest_errors']}，耗时 {stats['seconds']}s（{rate:.1f} 件/秒）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+颜色分类查找表
+
+图片分析把颜色量化到 32 级（每通道 8 档），只有 512 种可能的输入，
+因此颜色名称和 HSV 值在导入时一次性算好，之后分类只需查表。
+不在量化网格上的颜色回退到逐个计算，结果与查表一致。
+"""
+import colorsys
+
+import numpy as np
+
+# 量化位移：每通道保留高 3 位
+QUANT_SHIFT = 5
+QUANT_LEVELS = 256 >> QUANT_SHIFT
+
+# 颜色名称映射（HSV范围 -> 颜色名称）
+COLOR_RANGES = {
+    'red': [(0, 20), (340, 360)],      # 红色
+    'orange': [(20, 40)],               # 橙色
+    'yellow': [(40, 70)],               # 黄色
+    'green': [(70, 160)],               # 绿色
+    'blue': [(160, 250)],               # 蓝色
+    'purple': [(250, 290)],             # 紫色
+    'pink': [(290, 340)],               # 粉色
+}
+
+# 分类结果的全部取值，查表中以下标存储
+COLOR_KEYS = ('black', 'white', 'gray', 'brown', 'beige', 'navy') + tuple(COLOR_RANGES)
+
+# 百搭色
+NEUTRAL_COLORS = frozenset({'black', 'white', 'gray', 'beige'})
+
+
+def classify_rgb(rgb):
+    """根据RGB值计算颜色名称（查表的参考实现）"""
+    r, g, b = rgb
+
+    # 转换到HSV空间
+    h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+    h = h * 360  # 转换为0-360度
+    s = s * 100  # 转换为百分比
+    v = v * 100
+
+    # 检测黑白灰
+    if v < 20:
+        return 'black'
+    if v > 85 and s < 15:
+        return 'white'
+    if s < 15:
+        return 'gray'
+
+    # 检测棕色和米色
+    if 15 < h < 40 and 20 < s < 60 and 20 < v < 70:
+        return 'brown'
+    if 30 < h < 50 and 10 < s < 40 and 70 < v < 95:
+        return 'beige'
+
+    # 检测藏青色
+    if 200 < h < 240 and s > 30 and 20 < v < 50:
+        return 'navy'
+
+    # 根据色相判断颜色
+    for color_name, ranges in COLOR_RANGES.items():
+        for (low, high) in ranges:
+            if low <= h < high:
+                return color_name
+
+    return 'gray'  # 默认
+
+
+def pack(pixels):
+    """把 N x 3 的 RGB 数组量化并打包成 0-511 的下标"""
+    q = np.asarray(pixels, dtype=np.int32) >> QUANT_SHIFT
+    return (q[..., 0] << 6) | (q[..., 1] << 3) | q[..., 2]
+
+
+def unpack(index):
+    """下标还原为量化后的 RGB 元组"""
+    index = int(index)
+    return ((index >> 6) << QUANT_SHIFT, ((index >> 3) & 7) << QUANT_SHIFT, (index & 7) << QUANT_SHIFT)
+
+
+class ColorTable:
+    """量化颜色 -> 颜色名称 / HSV 的查找表"""
+
+    def __init__(self):
+        grid = [unpack(i) for i in range(QUANT_LEVELS ** 3)]
+        key_index = {name: i for i, name in enumerate(COLOR_KEYS)}
+        self.codes = np.array([key_index[classify_rgb(rgb)] for rgb in grid], dtype=np.uint8)
+        # HSV 均为 0-1
+        self.hsv = np.array([colorsys.rgb_to_hsv(r / 255, g / 255, b / 255) for r, g, b in grid])
+        self._names = [COLOR_KEYS[c] for c in self.codes]
+
+    @staticmethod
+    def _grid_index(rgb):
+        """颜色恰好在量化网格上时返回下标，否则返回 None"""
+        r, g, b = rgb
+        if (r | g | b) & ((1 << QUANT_SHIFT) - 1):
+            return None
+        return (r >> QUANT_SHIFT << 6) | (g >> QUANT_SHIFT << 3) | (b >> QUANT_SHIFT)
+
+    def name(self, rgb):
+        """单个颜色的名称"""
+        index = self._grid_index(rgb)
+        if index is None:
+            return classify_rgb(rgb)
+        return self._names[index]
+
+    def hsv_of(self, rgb):
+        """单个颜色的 (h, s, v)，均为 0-1"""
+        index = self._grid_index(rgb)
+        if index is None:
+            r, g, b = rgb
+            return colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+        h, s, v = self.hsv[index]
+        return float(h), float(s), float(v)
+
+    def classify(self, pixels):
+        """
+        批量分类（按 32 级量化）
+
+        Args:
+            pixels: N x 3 的 RGB 数组，或 H x W x 3 的图片数组
+
+        Returns:
+            list: 颜色名称列表（图片数组会被展平）
+        """
+        codes = self.codes[pack(np.asarray(pixels).reshape(-1, 3))]
+        return [COLOR_KEYS[c] for c in codes]
+
+    def distribution(self, pixels):
+        """
+        统计一组像素的颜色名称分布
+
+        Returns:
+            dict: {颜色名称: 占比}，按占比降序
+        """
+        codes = self.codes[pack(np.asarray(pixels).reshape(-1, 3))]
+        counts = np.bincount(codes, minlength=len(COLOR_KEYS))
+        total = int(counts.sum())
+        if not total:
+            return {}
+        order = np.argsort(-counts, kind='stable')
+        return {COLOR_KEYS[i]: round(int(counts[i]) / total, 4) for i in order if counts[i]}
+
+
+# 全局查找表，导入时构建（512 项，约 1ms）
+color_table = ColorTable()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重复衣物检测
+
+- dHash 感知哈希（64位），对缩放、压缩、轻微调色不敏感
+- 按汉明距离聚类整个衣橱的近似重复（BK-tree 与在线检索用的索引见 models/phash_index.py）
+
+查看整个衣橱的重复簇（在 src 目录下）:
+    python -m services.dedup [--threshold 10] [--backfill]
+"""
+import io
+import sys
+import argparse
+
+import numpy as np
+from PIL import Image
+
+from config import DUPLICATE_MAX_DISTANCE
+from models.phash_index import BKTree
+
+HASH_SIZE = 8
+
+
+def dhash(image_file):
+    """
+    计算图片的 dHash
+
+    Args:
+        image_file: 文件对象、文件路径或 bytes
+
+    Returns:
+        str: 16位十六进制字符串
+    """
+    if isinstance(image_file, bytes):
+        image_file = io.BytesIO(image_file)
+    if hasattr(image_file, 'seek'):
+        image_file.seek(0)
+    with Image.open(image_file) as img:
+        img.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        small = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = int(np.packbits(bits).view('>u8')[0])
+    return f'{value:016x}'
+
+
+def find_clusters(items, max_distance=DUPLICATE_MAX_DISTANCE):
+    """
+    将衣物按近似重复关系聚类
+
+    Args:
+        items: [(衣物ID, 哈希), ...]
+
+    Returns:
+        list: 重复簇列表，每个簇为衣物ID列表（只返回大小 > 1 的簇）
+    """
+    tree = BKTree()
+    for clothing_id, phash in items:
+        tree.add(phash, clothing_id)
+
+    parent = {clothing_id: clothing_id for clothing_id, _ in items}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for clothing_id, phash in items:
+        for other, _distance in tree.search(phash, max_distance):
+            a, b = find(clothing_id), find(other)
+            if a != b:
+                parent[b] = a
+
+    clusters = {}
+    for clothing_id, _ in items:
+        clusters.setdefault(find(clothing_id), []).append(clothing_id)
+    return sorted((sorted(c) for c in clusters.values() if len(c) > 1), key=len, reverse=True)
+
+
+def backfill():
+    """为缺少感知哈希的衣物补算哈希"""
+    from models.database import ClothingModel
+    from services.thumbnails import static_path
+
+    done = failed = 0
+    for item in ClothingModel.get_all():
+        if item.get('phash') or not item.get('image_path'):
+            continue
+        try:
+            ClothingModel.update(item['id'], phash=dhash(static_path(item['image_path'])))
+            done += 1
+        except Exception as e:
+            failed += 1
+            print(f"计算感知哈希失败 #{item['id']} {item['image_path']}: {e}", file=sys.stderr)
+    return {'generated': done, 'failed': failed}
+
+
+def main(argv=None):
+    from models.database import init_database, ClothingModel
+
+    parser = argparse.ArgumentParser(description='查找衣橱中的重复衣物')
+    parser.add_argument('--threshold', type=int, default=DUPLICATE_MAX_DISTANCE,
+                        help='判定为重复的最大汉明距离（0-64）')
+    parser.add_argument('--backfill', action='store_true', help='先为缺少哈希的衣物补算哈希')
+    args = parser.parse_args(argv)
+
+    init_database()
+    if args.backfill:
+        stats = backfill()
+        print(f"补算感知哈希: 成功 {stats['generated']}，失败 {stats['failed']}")
+
+    items = ClothingModel.get_phashes()
+    clusters = find_clusters(items, args.threshold)
+    print(f"共 {len(items)} 件衣物有感知哈希，发现 {len(clusters)} 组疑似重复:")
+    items_by_id = ClothingModel.get_by_ids([clothing_id for cluster in clusters for clothing_id in cluster])
+    for i, cluster in enumerate(clusters, 1):
+        print(f"\n[{i}] {len(cluster)} 件")
+        for clothing_id in cluster:
+            item = items_by_id[clothing_id]
+            print(f"    #{clothing_id} {item['name']} ({item['image_path']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片特征回填
+
+为特征缺失或分析版本过期的衣物重新分析图片，并把调色板、尺寸、
+内容哈希、感知哈希和分析版本写回 clothing 表。只处理版本过期的行，
+每行分析完立即提交，中断后重新运行即可继续。
+
+用法（在 src 目录下）:
+    python -m services.features [--batch-size 100]
+"""
+import sys
+import argparse
+
+from models.database import init_database, ClothingModel
+from services.analysis_cache import analyze_upload, analysis_version, feature_columns
+from services.thumbnails import static_path
+
+
+def backfill(batch_size=100, progress=None):
+    """
+    回填图片特征
+
+    Args:
+        batch_size: 每次从数据库读取的行数
+        progress: 进度回调 progress(stats)
+
+    Returns:
+        dict: {'updated', 'failed'}
+    """
+    version = analysis_version()
+    stats = {'updated': 0, 'failed': 0}
+    last_id = 0
+    while True:
+        rows = ClothingModel.get_stale_features(version, last_id, batch_size)
+        if not rows:
+            break
+        for row in rows:
+            last_id = row['id']
+            try:
+                with open(static_path(row['image_path']), 'rb') as f:
+                    content_hash, analysis, _cached = analyze_upload(f)
+                if 'error' in analysis:
+                    raise ValueError(analysis['error'])
+                ClothingModel.update(row['id'], **feature_columns(content_hash, analysis))
+                stats['updated'] += 1
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"\n分析失败 #{row['id']} {row['image_path']}: {e}", file=sys.stderr)
+        if progress:
+            progress(stats)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='回填衣物图片特征')
+    parser.add_argument('--batch-size', type=int, default=100, help='每次读取的行数')
+    args = parser.parse_args(argv)
+
+    init_database()
+
+    def report(stats):
+        print(f"\r已更新 {stats['updated']}  失败 {stats['failed']}", end='', flush=True)
+
+    try:
+        stats = backfill(args.batch_size, report)
+    except KeyboardInterrupt:
+        print("\n回填已中断，已完成的行不会重复分析，重新运行即可继续")
+        return 1
+
+    print(f"\n✅ 回填完成: 更新 {stats['updated']}，失败 {stats['failed']}（分析版本 {analysis_version()}）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
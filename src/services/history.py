@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推荐历史记录（写后批量落库）
+
+推荐接口只把记录放进内存缓冲区，不在请求中提交事务。后台线程在缓冲区
+达到 HISTORY_FLUSH_SIZE 条或距上次写库超过 HISTORY_FLUSH_INTERVAL 秒时，
+用 executemany 在一个事务中写入。缓冲区有上限，写满时丢弃新记录并计数；
+首次记录时自动启动后台线程，进程退出时 stop() 会把剩余记录写完。
+"""
+import threading
+from collections import deque
+
+from config import HISTORY_BUFFER_SIZE, HISTORY_FLUSH_SIZE, HISTORY_FLUSH_INTERVAL
+from models.database import RecommendationHistoryModel
+
+
+class HistoryWriter:
+    """推荐历史的有界缓冲区 + 后台批量写入线程"""
+
+    def __init__(self, writer=RecommendationHistoryModel.add_many, max_size=HISTORY_BUFFER_SIZE,
+                 flush_size=HISTORY_FLUSH_SIZE, interval=HISTORY_FLUSH_INTERVAL):
+        """
+        Args:
+            writer: writer(records)，在一个事务中写入一批记录
+            max_size: 缓冲区最多保存的记录数
+            flush_size: 达到该条数时唤醒后台线程立即写库
+            interval: 最长写库间隔（秒）
+        """
+        self.writer = writer
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = deque()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stats = {'recorded': 0, 'written': 0, 'dropped': 0, 'flushes': 0, 'errors': 0}
+
+    def record(self, temperature, weather, city, outfit_ids):
+        """
+        记录一次推荐（不访问数据库）
+
+        Returns:
+            bool: 缓冲区已满、记录被丢弃时返回 False
+        """
+        # 未经 app.initialize() 使用时（脚本等）在首次记录时启动后台线程
+        self.start()
+        with self._lock:
+            if len(self._buffer) >= self.max_size:
+                self._stats['dropped'] += 1
+                return False
+            self._buffer.append((temperature, weather, city, outfit_ids))
+            self._stats['recorded'] += 1
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self._wake.set()
+        return True
+
+    def flush(self):
+        """把缓冲区中的记录写入数据库，返回写入条数"""
+        # 后台线程和 stop() 可能同时写库，按顺序进行
+        with self._flush_lock:
+            with self._lock:
+                records = list(self._buffer)
+                self._buffer.clear()
+            if not records:
+                return 0
+            try:
+                self.writer(records)
+            except Exception as e:
+                with self._lock:
+                    self._stats['errors'] += 1
+                    self._stats['dropped'] += len(records)
+                print(f"推荐历史写入失败，丢弃 {len(records)} 条: {e}")
+                return 0
+            with self._lock:
+                self._stats['written'] += len(records)
+                self._stats['flushes'] += 1
+            return len(records)
+
+    def start(self):
+        """启动后台线程（重复调用无副作用）"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """停止后台线程，并写完缓冲区中剩余的记录"""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._buffer)
+        stats['running'] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+# 全局推荐历史写入器，由 app.initialize() 或首次 record() 启动
+history_writer = HistoryWriter()
@@ -4,23 +4,17 @@
 图片智能分析服务 - 基于颜色和形状的简单识别
 """
 from PIL import Image
-from collections import Counter
-import colorsys
+import numpy as np
 import io
+from config import IMAGE_ANALYSIS_FAST_MODE, PALETTE_ENGINE
+from services.color_table import COLOR_RANGES, color_table
+from services.palette import extract_palette
 
 class ImageAnalyzer:
     """衣物图片分析器"""
     
     # 颜色名称映射（HSV范围 -> 颜色名称）
-    COLOR_RANGES = {
-        'red': [(0, 20), (340, 360)],      # 红色
-        'orange': [(20, 40)],               # 橙色  
-        'yellow': [(40, 70)],               # 黄色
-        'green': [(70, 160)],               # 绿色
-        'blue': [(160, 250)],               # 蓝色
-        'purple': [(250, 290)],             # 紫色
-        'pink': [(290, 340)],               # 粉色
-    }
+    COLOR_RANGES = COLOR_RANGES
     
     # 颜色中文名映射
     COLOR_NAMES = {
@@ -40,13 +34,21 @@ class ImageAnalyzer:
         'accessories': {'min': -20, 'max': 40} # 配饰：全年
     }
     
+    # 分析算法版本，算法变化时递增，使缓存的分析结果失效
+    ANALYZER_VERSION = '3'
+    
+    # 颜色分析使用的缩略图尺寸
+    THUMBNAIL_SIZE = (100, 100)
+    
     @classmethod
-    def analyze(cls, image_file):
+    def analyze(cls, image_file, fast=IMAGE_ANALYSIS_FAST_MODE, engine=PALETTE_ENGINE):
         """
         分析图片并返回识别结果
         
         Args:
             image_file: 文件对象或文件路径
+            fast: 快速模式，JPEG 直接按缩小比例解码并使用更廉价的缩放滤镜
+            engine: 主色调提取引擎，见 services.palette.PALETTE_ENGINES
             
         Returns:
             dict: {
@@ -54,7 +56,10 @@ class ImageAnalyzer:
                 'suggested_color': 建议的颜色,
                 'dominant_colors': 主要颜色列表,
                 'suggested_temp': {'min': 最低温度, 'max': 最高温度},
-                'confidence': 置信度 (0-100)
+                'confidence': 置信度 (0-100),
+                'palette': 完整调色板（十六进制，按占比降序）,
+                'width': 原图宽度,
+                'height': 原图高度
             }
         """
         try:
@@ -65,25 +70,28 @@ class ImageAnalyzer:
             else:
                 img = Image.open(image_file)
             
-            # 转换为RGB
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
+            # 尺寸特征取自原图文件头，不受缩小解码影响
+            size = img.size
+            img_small = cls._make_thumbnail(img, fast)
             
             # 分析图片
-            dominant_colors = cls._extract_dominant_colors(img)
+            dominant_colors = cls._extract_dominant_colors(img_small, engine=engine)
             suggested_color = cls._get_color_name(dominant_colors[0] if dominant_colors else (128, 128, 128))
-            suggested_type = cls._guess_clothing_type(img, dominant_colors)
+            suggested_type = cls._guess_clothing_type(size, dominant_colors)
             suggested_temp = cls.TYPE_TEMP_RANGES.get(suggested_type, {'min': 10, 'max': 30})
             
             # 计算置信度（基于颜色纯度和图片质量）
-            confidence = cls._calculate_confidence(img, dominant_colors)
+            confidence = cls._calculate_confidence(size, dominant_colors)
             
             return {
                 'suggested_type': suggested_type,
                 'suggested_color': suggested_color,
                 'dominant_colors': [cls._rgb_to_hex(c) for c in dominant_colors[:3]],
                 'suggested_temp': suggested_temp,
-                'confidence': confidence
+                'confidence': confidence,
+                'palette': [cls._rgb_to_hex(c) for c in dominant_colors],
+                'width': size[0],
+                'height': size[1]
             }
             
         except Exception as e:
@@ -98,81 +106,50 @@ class ImageAnalyzer:
             }
     
     @classmethod
-    def _extract_dominant_colors(cls, img, num_colors=5):
+    def _make_thumbnail(cls, img, fast=True):
+        """生成颜色分析用的RGB缩略图"""
+        if not fast:
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            return img.resize(cls.THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        
+        # JPEG 草稿模式：解码时直接按 1/2 ~ 1/8 缩小，其他格式忽略
+        draft_size = (cls.THUMBNAIL_SIZE[0] * 2, cls.THUMBNAIL_SIZE[1] * 2)
+        img.draft('RGB', draft_size)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return img.resize(cls.THUMBNAIL_SIZE, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    
+    @classmethod
+    def _extract_dominant_colors(cls, img, num_colors=5, engine=PALETTE_ENGINE):
         """提取图片主要颜色"""
         # 缩小图片以加快处理速度
-        img_small = img.resize((100, 100), Image.Resampling.LANCZOS)
-        pixels = list(img_small.getdata())
-        
-        # 过滤掉太亮或太暗的像素（可能是背景）
-        filtered_pixels = []
-        for pixel in pixels:
-            r, g, b = pixel[:3]
-            # 计算亮度
-            brightness = (r + g + b) / 3
-            # 过滤纯白和纯黑背景
-            if 20 < brightness < 240:
-                filtered_pixels.append((r, g, b))
-        
-        if not filtered_pixels:
-            filtered_pixels = [(r, g, b) for r, g, b, *_ in [p if len(p) >= 3 else (p[0], p[0], p[0]) for p in pixels[:100]]]
-        
-        # 对颜色进行量化（减少颜色数量）
-        quantized = []
-        for r, g, b in filtered_pixels:
-            # 将颜色量化到32级
-            qr = (r // 32) * 32
-            qg = (g // 32) * 32
-            qb = (b // 32) * 32
-            quantized.append((qr, qg, qb))
-        
-        # 统计颜色频率
-        color_counts = Counter(quantized)
-        dominant = color_counts.most_common(num_colors)
-        
-        return [color for color, count in dominant]
+        if img.size != cls.THUMBNAIL_SIZE:
+            img = img.resize(cls.THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        return extract_palette(np.asarray(img), num_colors, engine)
     
     @classmethod
     def _get_color_name(cls, rgb):
         """根据RGB值获取颜色名称"""
-        r, g, b = rgb
-        
-        # 转换到HSV空间
-        h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
-        h = h * 360  # 转换为0-360度
-        s = s * 100  # 转换为百分比
-        v = v * 100
-        
-        # 检测黑白灰
-        if v < 20:
-            return 'black'
-        if v > 85 and s < 15:
-            return 'white'
-        if s < 15:
-            return 'gray'
-        
-        # 检测棕色和米色
-        if 15 < h < 40 and 20 < s < 60 and 20 < v < 70:
-            return 'brown'
-        if 30 < h < 50 and 10 < s < 40 and 70 < v < 95:
-            return 'beige'
-        
-        # 检测藏青色
-        if 200 < h < 240 and s > 30 and 20 < v < 50:
-            return 'navy'
-        
-        # 根据色相判断颜色
-        for color_name, ranges in cls.COLOR_RANGES.items():
-            for (low, high) in ranges:
-                if low <= h < high:
-                    return color_name
+        return color_table.name(rgb)
+    
+    @classmethod
+    def classify_colors(cls, colors):
+        """
+        批量获取颜色名称
         
-        return 'gray'  # 默认
+        Args:
+            colors: RGB 元组列表、N x 3 数组或 H x W x 3 的图片数组（按32级量化）
+            
+        Returns:
+            list: 颜色名称列表
+        """
+        return color_table.classify(colors)
     
     @classmethod
-    def _guess_clothing_type(cls, img, dominant_colors):
+    def _guess_clothing_type(cls, size, dominant_colors):
         """根据图片特征猜测衣物类型"""
-        width, height = img.size
+        width, height = size
         aspect_ratio = width / height
         
         # 获取主色调的特征
@@ -181,8 +158,8 @@ class ImageAnalyzer:
             r, g, b = main_color
             brightness = (r + g + b) / 3
             
-            # 转换为HSV
-            h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
+            # HSV 取自查找表
+            h, s, v = color_table.hsv_of(main_color)
             saturation = s * 100
         else:
             brightness = 128
@@ -208,12 +185,12 @@ class ImageAnalyzer:
         return 'tops'
     
     @classmethod
-    def _calculate_confidence(cls, img, dominant_colors):
+    def _calculate_confidence(cls, size, dominant_colors):
         """计算识别置信度"""
         confidence = 50  # 基础置信度
         
         # 图片质量加分
-        width, height = img.size
+        width, height = size
         if width >= 200 and height >= 200:
             confidence += 15
         if width >= 400 and height >= 400:
@@ -222,9 +199,8 @@ class ImageAnalyzer:
         # 颜色清晰度加分
         if dominant_colors:
             main_color = dominant_colors[0]
-            r, g, b = main_color
             # 颜色饱和度高说明图片主体清晰
-            h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
+            h, s, v = color_table.hsv_of(main_color)
             if s > 0.3:
                 confidence += 15
             if v > 0.3 and v < 0.9:
@@ -239,6 +215,6 @@ class ImageAnalyzer:
 
 
 # 便捷函数
-def analyze_clothing_image(image_file):
+def analyze_clothing_image(image_file, fast=IMAGE_ANALYSIS_FAST_MODE):
     """分析衣物图片的便捷函数"""
-    return ImageAnalyzer.analyze(image_file)
+    return ImageAnalyzer.analyze(image_file, fast=fast)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主色调提取引擎
+
+- histogram: 32级量化直方图（原算法），最快，但同一颜色会被拆到相邻的格子里
+- kmeans: CIELAB 空间的 mini-batch k-means，迭代次数固定
+- median_cut: CIELAB 空间的中位切分
+
+kmeans 和 median_cut 会先根据图片边框估计背景色并剔除背景像素，需在配置中
+显式启用（默认 histogram）。
+所有引擎都在缩略图的像素数组上运行，耗时与原图尺寸无关。
+"""
+import numpy as np
+
+from config import PALETTE_ENGINE, PALETTE_KMEANS_ITERATIONS, PALETTE_KMEANS_BATCH
+from services.color_table import pack, unpack
+
+# 与背景色的 Lab 距离小于该值的像素视为背景
+BACKGROUND_DELTA = 12.0
+# 边框像素与其中位色的典型距离超过该值时，认为背景不是纯色，不做剔除
+BACKGROUND_MAX_SPREAD = 10.0
+# 前景像素少于该比例时放弃剔除背景
+MIN_FOREGROUND = 0.05
+
+# D65 白点下 sRGB 与 XYZ 的转换矩阵
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+_WHITE = _RGB_TO_XYZ.sum(axis=1)
+
+
+def rgb_to_lab(rgb):
+    """N x 3 的 sRGB（0-255）转 CIELAB"""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = linear @ _RGB_TO_XYZ.T / _WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+def lab_to_rgb(lab):
+    """N x 3 的 CIELAB 转 sRGB（0-255 整数）"""
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[:, 0] + 16) / 116
+    f = np.stack([fy + lab[:, 1] / 500, fy, fy - lab[:, 2] / 200], axis=1)
+    xyz = np.where(f > 6 / 29, f ** 3, 3 * (6 / 29) ** 2 * (f - 4 / 29)) * _WHITE
+    linear = np.clip(xyz @ _XYZ_TO_RGB.T, 0, 1)
+    c = np.where(linear > 0.0031308, 1.055 * linear ** (1 / 2.4) - 0.055, linear * 12.92)
+    return np.clip(np.rint(c * 255), 0, 255).astype(np.int64)
+
+
+def _to_tuples(rgb):
+    return [tuple(int(v) for v in c) for c in rgb]
+
+
+def foreground_lab(pixels):
+    """
+    剔除背景后的前景像素（Lab）
+
+    Args:
+        pixels: H x W x 3 的 RGB 数组
+    """
+    lab = rgb_to_lab(pixels.reshape(-1, 3)).reshape(pixels.shape[0], pixels.shape[1], 3)
+    border = np.concatenate([lab[0], lab[-1], lab[1:-1, 0], lab[1:-1, -1]])
+    background = np.median(border, axis=0)
+    lab = lab.reshape(-1, 3)
+    if np.median(np.linalg.norm(border - background, axis=1)) > BACKGROUND_MAX_SPREAD:
+        return lab
+
+    mask = np.linalg.norm(lab - background, axis=1) > BACKGROUND_DELTA
+    if mask.sum() < MIN_FOREGROUND * len(lab):
+        return lab
+    return lab[mask]
+
+
+def histogram(pixels, num_colors=5):
+    """32级量化直方图，按出现次数返回主要颜色"""
+    pixels = pixels.reshape(-1, pixels.shape[-1])[:, :3].astype(np.int32)
+
+    # 过滤掉太亮或太暗的像素（可能是背景）：20 < 平均亮度 < 240
+    brightness_sum = pixels.sum(axis=1)
+    filtered = pixels[(brightness_sum > 60) & (brightness_sum < 720)]
+    if len(filtered) == 0:
+        filtered = pixels[:100]
+
+    # 将颜色量化到32级，并把三个通道打包成一个 0-511 的索引
+    packed = pack(filtered)
+
+    # 统计颜色频率，频率相同时按首次出现的顺序排列
+    counts = np.bincount(packed, minlength=512)
+    first_seen = np.empty(512, dtype=np.int64)
+    first_seen[packed[::-1]] = np.arange(len(packed) - 1, -1, -1)
+
+    candidates = np.flatnonzero(counts)
+    if len(candidates) > num_colors:
+        kth = np.partition(counts[candidates], -num_colors)[-num_colors]
+        candidates = candidates[counts[candidates] >= kth]
+    order = np.lexsort((first_seen[candidates], -counts[candidates]))
+    dominant = candidates[order[:num_colors]]
+
+    return [unpack(c) for c in dominant]
+
+
+def _nearest(points, centers):
+    """每个点最近的中心下标"""
+    distances = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)
+    return distances.argmin(axis=1)
+
+
+def kmeans(pixels, num_colors=5, iterations=PALETTE_KMEANS_ITERATIONS, batch_size=PALETTE_KMEANS_BATCH, seed=0):
+    """CIELAB 空间的 mini-batch k-means，按簇大小返回簇中心"""
+    lab = foreground_lab(pixels)
+    rng = np.random.default_rng(seed)
+    k = min(num_colors, len(lab))
+
+    # k-means++ 初始化（在一个批次的样本上进行）
+    sample = lab[rng.integers(0, len(lab), min(batch_size, len(lab)))]
+    centers = [sample[rng.integers(len(sample))]]
+    closest = ((sample - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        if not closest.sum():
+            break
+        centers.append(sample[rng.choice(len(sample), p=closest / closest.sum())])
+        closest = np.minimum(closest, ((sample - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+    counts = np.zeros(len(centers))
+
+    # 固定迭代次数，每次用一个随机批次更新中心（学习率随簇累计样本数递减）
+    for _ in range(iterations):
+        batch = lab[rng.integers(0, len(lab), min(batch_size, len(lab)))]
+        labels = _nearest(batch, centers)
+        batch_counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, batch)
+        updated = batch_counts > 0
+        counts[updated] += batch_counts[updated]
+        centers[updated] += (sums[updated] - batch_counts[updated, None] * centers[updated]) / counts[updated, None]
+
+    sizes = np.bincount(_nearest(lab, centers), minlength=len(centers))
+    order = np.argsort(-sizes, kind='stable')
+    order = order[sizes[order] > 0]
+    return _to_tuples(lab_to_rgb(centers[order]))
+
+
+def median_cut(pixels, num_colors=5):
+    """CIELAB 空间的中位切分，按盒子内像素数返回盒子均值"""
+    boxes = [foreground_lab(pixels)]
+    while len(boxes) < num_colors:
+        # 切分跨度最大的盒子（跨度按像素数加权）
+        spans = [np.ptp(box, axis=0) if len(box) > 1 else np.zeros(3) for box in boxes]
+        scores = [span.max() * np.sqrt(len(box)) for span, box in zip(spans, boxes)]
+        index = int(np.argmax(scores))
+        if scores[index] == 0:
+            break
+        box = boxes.pop(index)
+        axis = int(spans[index].argmax())
+        order = np.argsort(box[:, axis], kind='stable')
+        half = len(box) // 2
+        boxes.extend([box[order[:half]], box[order[half:]]])
+
+    boxes.sort(key=len, reverse=True)
+    return _to_tuples(lab_to_rgb(np.array([box.mean(axis=0) for box in boxes])))
+
+
+# 可选的主色调提取引擎
+PALETTE_ENGINES = {
+    'histogram': histogram,
+    'kmeans': kmeans,
+    'median_cut': median_cut,
+}
+
+
+def extract_palette(pixels, num_colors=5, engine=PALETTE_ENGINE):
+    """
+    提取主要颜色
+
+    Args:
+        pixels: H x W x 3（或 H x W 灰度）的像素数组
+        num_colors: 最多返回的颜色数
+        engine: 引擎名称，见 PALETTE_ENGINES
+
+    Returns:
+        list: RGB 元组列表，按占比降序
+    """
+    if engine not in PALETTE_ENGINES:
+        raise ValueError(f'未知的主色调提取引擎: {engine}')
+    pixels = np.asarray(pixels)
+    if pixels.ndim == 2:
+        pixels = np.stack([pixels] * 3, axis=-1)
+    return PALETTE_ENGINES[engine](pixels[..., :3], num_colors)
@@ -4,8 +4,9 @@
 穿搭推荐服务
 """
 import random
-from models.database import ClothingModel
+from models.database import ClothingModel, WardrobeSummaryModel
 from config import TEMPERATURE_RANGES, CLOTHING_TYPES
+from services.color_table import NEUTRAL_COLORS, color_table
 
 class OutfitRecommender:
     """穿搭推荐引擎"""
@@ -62,6 +63,20 @@ class OutfitRecommender:
             return 'very_cold'
         return 'hot'
     
+    @staticmethod
+    def get_forecast_temperature(high, low):
+        """
+        根据预报最高/最低温度估算穿衣参考温度
+        
+        白天活动时间更长，参考温度取偏向最高温的加权值；
+        昼夜温差较大时向最低温靠拢，以便推荐可以增减的层次
+        """
+        high, low = float(high), float(low)
+        if high < low:
+            high, low = low, high
+        weight = 0.5 if high - low >= 10 else 0.6
+        return round(low + (high - low) * weight, 1)
+    
     @classmethod
     def recommend(cls, temperature, style=None, count=3):
         """
@@ -79,13 +94,8 @@ class OutfitRecommender:
         temp_level = cls.get_temperature_level(temp)
         rules = cls.OUTFIT_RULES.get(temp_level, cls.OUTFIT_RULES['mild'])
         
-        # 获取适合当前温度的所有衣物
-        suitable_clothing = {}
-        for clothing_type in CLOTHING_TYPES.keys():
-            items = ClothingModel.get_by_temperature(temp, clothing_type)
-            if style:
-                items = [item for item in items if item.get('style') == style or not item.get('style')]
-            suitable_clothing[clothing_type] = items
+        # 获取适合当前温度（及风格）的所有衣物，一次查询按类型分组取回
+        suitable_clothing = ClothingModel.get_candidates(temp, style)
         
         # 生成推荐组合
         recommendations = []
@@ -125,6 +135,17 @@ class OutfitRecommender:
         recommendations.sort(key=lambda x: x['score'], reverse=True)
         return recommendations
     
+    @staticmethod
+    def _item_color(item):
+        """衣物颜色：优先使用填写的颜色，未填写时取入库调色板的主色"""
+        color = item.get('color')
+        if color and color != 'other':
+            return color
+        palette = item.get('palette')
+        if palette:
+            return color_table.name(tuple(bytes.fromhex(palette[0].lstrip('#'))))
+        return color
+    
     @staticmethod
     def _calculate_score(outfit):
         """计算穿搭组合评分"""
@@ -139,15 +160,14 @@ class OutfitRecommender:
             score += 30
         
         # 颜色搭配加分（简单规则）
-        colors = [item.get('color') for item in items.values() if item.get('color')]
+        colors = [c for c in (OutfitRecommender._item_color(item) for item in items.values()) if c]
         if colors:
             # 颜色数量适中（2-3种）加分
             unique_colors = set(colors)
             if 2 <= len(unique_colors) <= 3:
                 score += 20
             # 包含黑白灰等百搭色加分
-            neutral_colors = {'black', 'white', 'gray', 'beige'}
-            if unique_colors & neutral_colors:
+            if unique_colors & NEUTRAL_COLORS:
                 score += 10
         
         return min(score, 100)  # 最高100分
@@ -155,24 +175,25 @@ class OutfitRecommender:
     @classmethod
     def get_wardrobe_summary(cls):
         """获取衣橱概况"""
+        # 统计和温度覆盖都来自触发器维护的汇总表，最近添加的衣物只取5条
         stats = ClothingModel.get_statistics()
-        all_items = ClothingModel.get_all()
+        coverage = WardrobeSummaryModel.get_coverage()
+        recent_items, _ = ClothingModel.get_page(limit=5)
         
-        # 按温度范围统计
+        # 按温度范围统计（以区间中点温度计）
         temp_coverage = {}
         for level, range_info in TEMPERATURE_RANGES.items():
-            mid_temp = (range_info['min'] + range_info['max']) / 2
-            items = ClothingModel.get_by_temperature(mid_temp)
+            counts = coverage.get(level, {})
             temp_coverage[level] = {
                 'label': range_info['label'],
-                'count': len(items),
-                'has_complete_outfit': cls._check_complete_outfit(items)
+                'count': sum(counts.values()),
+                'has_complete_outfit': cls._check_complete_outfit([{'type': t} for t in counts])
             }
         
         return {
             'statistics': stats,
             'temperature_coverage': temp_coverage,
-            'recent_items': all_items[:5] if all_items else []
+            'recent_items': recent_items
         }
     
     @staticmethod
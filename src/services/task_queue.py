@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务队列
+
+固定数量的工作线程 + 有界队列。队列满时 submit 直接抛出 QueueFullError，
+由调用方决定如何反压（例如返回 503）。任务状态保存在内存中，供轮询查询。
+"""
+import uuid
+import queue
+import threading
+import traceback
+from collections import OrderedDict
+
+
+class QueueFullError(Exception):
+    """任务队列已满"""
+
+
+class TaskQueue:
+    """有界后台任务队列"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, name, workers, max_pending, history=1000):
+        """
+        Args:
+            name: 队列名称（用作线程名前缀）
+            workers: 工作线程数
+            max_pending: 最多排队的任务数
+            history: 最多保留的任务状态条数
+        """
+        self.name = name
+        self.workers = workers
+        self.history = history
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """启动工作线程（重复调用无副作用）"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'{self.name}-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=10):
+        """处理完已排队的任务后停止工作线程"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def is_full(self):
+        return self._queue.full()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        提交任务
+
+        Returns:
+            str: 任务ID
+
+        Raises:
+            QueueFullError: 队列已满
+        """
+        self.start()
+        job_id = uuid.uuid4().hex
+        job = {'id': job_id, 'status': self.QUEUED, 'result': None, 'error': None}
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+        try:
+            self._queue.put_nowait((job, func, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            raise QueueFullError(f'{self.name} 队列已满')
+        return job_id
+
+    def get(self, job_id):
+        """查询任务状态，不存在时返回 None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'pending': self._queue.qsize(), 'workers': len(self._threads), 'jobs': counts}
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                break
+            job, func, args, kwargs = task
+            job['status'] = self.RUNNING
+            try:
+                job['result'] = func(*args, **kwargs)
+                job['status'] = self.DONE
+            except Exception as e:
+                job['error'] = str(e)
+                job['status'] = self.FAILED
+                traceback.print_exc()
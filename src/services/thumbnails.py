@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+衣物图片缩略图服务
+
+为每张原图生成多种宽度的 WebP / JPEG 缩略图，文件名带内容指纹，
+可以配合长期 immutable 缓存头提供给前端。
+
+为已有衣物补生成缩略图（在 src 目录下）:
+    python -m services.thumbnails [--force]
+"""
+import io
+import os
+import sys
+import hashlib
+import argparse
+
+from PIL import Image, ImageOps
+
+from config import THUMBNAIL_FOLDER, THUMBNAIL_WIDTHS
+
+# 输出格式: 扩展名 -> (PIL格式, 保存参数)
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def static_path(relative_path):
+    """static 目录下的相对路径 -> 绝对路径"""
+    return os.path.join(os.path.dirname(THUMBNAIL_FOLDER), relative_path)
+
+
+def generate_thumbnails(image_path, widths=THUMBNAIL_WIDTHS, data=None):
+    """
+    为原图生成缩略图
+    
+    Args:
+        image_path: 原图相对 static 目录的路径，如 uploads/tops/xxx.jpg
+        widths: 缩略图宽度列表
+        data: 原图内容（已读入内存时传入，避免重新读取文件）
+        
+    Returns:
+        dict: {'160': {'webp': 'thumbs/...', 'jpeg': 'thumbs/...'}, ...}，
+              路径相对 static 目录；不放大原图，比原图宽的尺寸会被跳过
+    """
+    if data is None:
+        with open(static_path(image_path), 'rb') as f:
+            data = f.read()
+    fingerprint = hashlib.sha256(data).hexdigest()[:12]
+    
+    # 缩略图目录结构与上传目录保持一致：thumbs/<类型>/<文件名>.<指纹>.<宽度>.<格式>
+    parts = image_path.split('/')
+    subdir = parts[1] if len(parts) > 2 else ''
+    stem = os.path.splitext(parts[-1])[0]
+    out_dir = os.path.join(THUMBNAIL_FOLDER, subdir)
+    os.makedirs(out_dir, exist_ok=True)
+    
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft('RGB', (max(widths), max(widths)))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        sizes = sorted(widths)
+        sizes = [w for w in sizes if w <= img.width] or sizes[:1]
+        
+        thumbnails = {}
+        # 从大到小依次缩放，每次以上一级结果为输入
+        current = img
+        for width in reversed(sizes):
+            width = min(width, img.width)
+            height = max(1, round(img.height * width / img.width))
+            current = current.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            
+            variants = {}
+            for ext, (fmt, params) in THUMBNAIL_FORMATS.items():
+                filename = f"{stem}.{fingerprint}.{width}.{ext}"
+                current.save(os.path.join(out_dir, filename), fmt, **params)
+                variants[ext] = '/'.join(p for p in ('thumbs', subdir, filename) if p)
+            thumbnails[str(width)] = variants
+    
+    return dict(sorted(thumbnails.items(), key=lambda kv: int(kv[0])))
+
+
+def _thumbnail_paths(thumbnails):
+    return {path for variants in (thumbnails or {}).values() for path in variants.values()}
+
+
+def delete_thumbnails(thumbnails, keep=None):
+    """删除缩略图文件，keep 中仍在使用的文件除外"""
+    for path in _thumbnail_paths(thumbnails) - _thumbnail_paths(keep):
+        file_path = static_path(path)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def backfill(force=False):
+    """为缺少缩略图的衣物补生成缩略图"""
+    from models.database import ClothingModel
+    
+    items = [item for item in ClothingModel.get_all()
+             if item.get('image_path') and (force or not item.get('thumbnails'))]
+    done = failed = 0
+    for i, item in enumerate(items, 1):
+        try:
+            thumbnails = generate_thumbnails(item['image_path'])
+            ClothingModel.update(item['id'], thumbnails=thumbnails)
+            delete_thumbnails(item.get('thumbnails'), keep=thumbnails)
+            done += 1
+        except Exception as e:
+            failed += 1
+            print(f"\n生成缩略图失败 #{item['id']} {item['image_path']}: {e}", file=sys.stderr)
+        print(f"\r缩略图 {i}/{len(items)}", end='', flush=True)
+    print()
+    return {'total': len(items), 'generated': done, 'failed': failed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='为已有衣物生成缩略图')
+    parser.add_argument('--force', action='store_true', help='重新生成所有缩略图')
+    args = parser.parse_args(argv)
+    
+    from models.database import init_database
+    init_database()
+    stats = backfill(force=args.force)
+    print(f"✅ 缩略图生成完成: 共 {stats['total']}，成功 {stats['generated']}，失败 {stats['failed']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
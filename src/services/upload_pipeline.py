@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传后台处理流水线
+
+上传接口只负责保存原图和写入数据库，缩略图生成、图片分析与特征入库、重复检测、元数据补全等耗时操作
+交给后台队列异步完成，上传页面通过任务ID轮询处理进度。
+"""
+from config import UPLOAD_WORKERS, UPLOAD_QUEUE_SIZE, UPLOAD_JOB_HISTORY
+from models.database import ClothingModel, duplicate_index
+from services.analysis_cache import analyze_upload, feature_columns
+from services.task_queue import TaskQueue
+from services.thumbnails import generate_thumbnails, static_path
+
+# 全局上传处理队列，由 app.initialize() 启动
+upload_queue = TaskQueue('upload', UPLOAD_WORKERS, UPLOAD_QUEUE_SIZE, UPLOAD_JOB_HISTORY)
+
+
+def process_upload(clothing_id, image_path, fill_color=False):
+    """
+    处理一次上传
+    
+    Args:
+        clothing_id: 衣物ID
+        image_path: 原图相对 static 目录的路径
+        fill_color: 用户未填写颜色时，用分析结果补全
+        
+    Returns:
+        dict: 处理结果，作为任务结果返回给轮询方
+    """
+    updates = {'thumbnails': generate_thumbnails(image_path)}
+    
+    with open(static_path(image_path), 'rb') as f:
+        content_hash, analysis, _cached = analyze_upload(f)
+    updates.update(feature_columns(content_hash, analysis))
+    
+    if fill_color and analysis.get('suggested_color'):
+        updates['color'] = analysis['suggested_color']
+    
+    duplicates = []
+    if analysis.get('phash'):
+        duplicates = duplicate_index.find(analysis['phash'], exclude=clothing_id)
+    ClothingModel.update(clothing_id, **updates)
+    
+    return {
+        'clothing_id': clothing_id,
+        'content_hash': content_hash,
+        'analysis': analysis,
+        'thumbnails': updates['thumbnails'],
+        'duplicates': duplicates,
+        'updated': sorted(k for k, v in updates.items() if v is not None)
+    }
+
+
+def submit_upload(clothing_id, image_path, fill_color=False):
+    """提交上传处理任务，返回任务ID；队列已满时抛出 QueueFullError"""
+    return upload_queue.submit(process_upload, clothing_id, image_path, fill_color=fill_color)